@@ -1,18 +1,23 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from .webhooks import replay
 from .models import (
     User,
     VehicleCategory,
     Vehicle,
-    VehicleAvailability,
+    VehicleReservation,
     SafariPackage,
+    SafariDeparture,
     SafariItinerary,
     Booking,
     Payment,
     Invoice,
+    WebhookEvent,
     Review,
     Notification,
-    AdminLog
+    OutgoingEmail,
+    AdminLog,
+    SeasonalRate,
 )
 
 # -------------------------------
@@ -33,16 +38,18 @@ class VehicleCategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'description')
     search_fields = ('name',)
 
-class VehicleAvailabilityInline(admin.TabularInline):
-    model = VehicleAvailability
-    extra = 1
+class VehicleReservationInline(admin.TabularInline):
+    model = VehicleReservation
+    fields = ('period', 'booking', 'is_active')
+    readonly_fields = ('booking',)
+    extra = 0
 
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'seats', 'daily_rate', 'with_driver', 'is_available', 'image_tag', 'created_at')
     list_filter = ('category', 'with_driver', 'is_available')
     search_fields = ('name', 'description')
-    inlines = [VehicleAvailabilityInline]
+    inlines = [VehicleReservationInline]
 
     readonly_fields = ('image_tag',)
 
@@ -59,12 +66,16 @@ class SafariItineraryInline(admin.TabularInline):
     model = SafariItinerary
     extra = 1
 
+class SafariDepartureInline(admin.TabularInline):
+    model = SafariDeparture
+    extra = 0
+
 @admin.register(SafariPackage)
 class SafariPackageAdmin(admin.ModelAdmin):
-    list_display = ('name', 'region', 'duration_days', 'base_price', 'seats_available', 'image_tag', 'created_at')
-    list_filter = ('region',)
+    list_display = ('name', 'region', 'duration_days', 'base_price', 'seats_available', 'is_featured', 'image_tag', 'created_at')
+    list_filter = ('region', 'is_featured')
     search_fields = ('name', 'description')
-    inlines = [SafariItineraryInline]
+    inlines = [SafariItineraryInline, SafariDepartureInline]
 
     readonly_fields = ('image_tag',)
 
@@ -102,6 +113,18 @@ class InvoiceAdmin(admin.ModelAdmin):
     list_display = ('payment', 'pdf_url', 'issued_at')
     search_fields = ('payment__transaction_ref',)
 
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('provider', 'dedupe_key', 'status', 'attempts', 'result', 'received_at', 'processed_at')
+    list_filter = ('provider', 'status')
+    search_fields = ('dedupe_key',)
+    readonly_fields = ('provider', 'dedupe_key', 'payload', 'status', 'attempts', 'result', 'received_at', 'processed_at')
+    actions = ('replay_events',)
+
+    @admin.action(description="Replay selected failed events")
+    def replay_events(self, request, queryset):
+        self.message_user(request, f"{replay(queryset)} events queued for replay.")
+
 # -------------------------------
 # 6. Reviews
 # -------------------------------
@@ -120,6 +143,13 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('is_read',)
     search_fields = ('user__email', 'message')
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('to', 'subject', 'body', 'attempts', 'last_error', 'claimed_until', 'created_at')
+
 # -------------------------------
 # 8. Admin Logs (Audit Trail)
 # -------------------------------
@@ -128,3 +158,11 @@ class AdminLogAdmin(admin.ModelAdmin):
     list_display = ('admin', 'action', 'created_at')
     search_fields = ('admin__email', 'action')
     readonly_fields = ('created_at',)
+
+# -------------------------------
+# 9. Pricing
+# -------------------------------
+@admin.register(SeasonalRate)
+class SeasonalRateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'applies_to', 'start_date', 'end_date', 'multiplier')
+    list_filter = ('applies_to',)
@@ -0,0 +1,166 @@
+"""
+Vehicle reservation helpers.
+
+A reservation stores a whole booked stretch of days as one daterange. The
+exclusion constraint on VehicleReservation guarantees that active
+reservations of the same vehicle never overlap, so checking and claiming a
+range costs one statement each, whatever the length of the trip.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import IntegrityError, transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ParseError
+
+from .cache import bump_version_on_commit, model_scope
+from .models import VehicleReservation
+
+
+class ReservationConflict(Exception):
+    """The requested dates overlap an active reservation of the vehicle."""
+
+
+def reservation_period(start, end=None):
+    """Half-open daterange covering ``start``..``end`` (both inclusive)."""
+    end = end or start
+    return DateRange(start, end + timedelta(days=1), "[)")
+
+
+def is_vehicle_free(vehicle, start, end=None):
+    return not VehicleReservation.objects.filter(
+        vehicle=vehicle, is_active=True, period__overlap=reservation_period(start, end)
+    ).exists()
+
+
+def reserve_vehicle(vehicle, start, end=None, booking=None):
+    """
+    Claim ``start``..``end`` on ``vehicle``.
+    Raises ReservationConflict if any of those days is already taken,
+    including when a concurrent transaction claimed them first.
+    """
+    if not is_vehicle_free(vehicle, start, end):
+        raise ReservationConflict()
+    try:
+        with transaction.atomic():
+            return VehicleReservation.objects.create(
+                vehicle=vehicle, booking=booking, period=reservation_period(start, end)
+            )
+    except IntegrityError:
+        raise ReservationConflict()
+
+
+def reserve_vehicles(claims):
+    """
+    Claim several ``(vehicle_id, start, end, booking)`` ranges at once.
+
+    Inserts go out in (vehicle, start) order so that two transactions
+    claiming overlapping sets of vehicles always wait on each other in the
+    same order and cannot deadlock.
+    """
+    claims = sorted(claims, key=lambda claim: (str(claim[0]), claim[1]))
+    for prev, cur in zip(claims, claims[1:]):
+        if prev[0] == cur[0] and cur[1] <= (prev[2] or prev[1]):
+            raise ReservationConflict()
+
+    overlaps = Q()
+    for vehicle_id, start, end, _ in claims:
+        overlaps |= Q(vehicle_id=vehicle_id, period__overlap=reservation_period(start, end))
+    if claims and VehicleReservation.objects.filter(overlaps, is_active=True).exists():
+        raise ReservationConflict()
+    try:
+        with transaction.atomic():
+            reservations = VehicleReservation.objects.bulk_create([
+                VehicleReservation(vehicle_id=vehicle_id, booking=booking, period=reservation_period(start, end))
+                for vehicle_id, start, end, booking in claims
+            ])
+    except IntegrityError:
+        raise ReservationConflict()
+    # bulk_create sends no post_save
+    bump_version_on_commit("availability", model_scope(VehicleReservation))
+    return reservations
+
+
+def parse_window_date(params, name):
+    """The ``name`` query parameter as a date, None if absent; ParseError (400) if not a real date."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ParseError(f"{name} must be a YYYY-MM-DD date")
+    return parsed
+
+
+def window_from_params(params, start_name, end_name, default_days, max_days=None):
+    """
+    ``(start, end)`` from two date query parameters: today through
+    ``default_days`` ahead unless given, and shorter than ``max_days``
+    (AVAILABILITY_MAX_WINDOW_DAYS by default). Raises ParseError (400).
+    """
+    max_days = max_days or settings.AVAILABILITY_MAX_WINDOW_DAYS
+    start = parse_window_date(params, start_name) or timezone.localdate()
+    end = parse_window_date(params, end_name) or start + timedelta(days=default_days)
+    if end < start:
+        raise ParseError(f"{end_name} must be on or after {start_name}")
+    if (end - start).days >= max_days:
+        raise ParseError(f"window is limited to {max_days} days")
+    return start, end
+
+
+def availability_window(request=None):
+    """
+    Days of reservations rendered with a vehicle: today through
+    AVAILABILITY_WINDOW_DAYS ahead, unless ``?availability_from=`` /
+    ``?availability_to=`` widen it (up to AVAILABILITY_MAX_WINDOW_DAYS).
+    """
+    params = request.query_params if request is not None else {}
+    return window_from_params(params, "availability_from", "availability_to", settings.AVAILABILITY_WINDOW_DAYS)
+
+
+def active_reservations(request=None):
+    """Queryset for prefetching ``Vehicle.reservations``: live ones inside the availability window."""
+    return VehicleReservation.objects.filter(
+        is_active=True, period__overlap=reservation_period(*availability_window(request))
+    ).order_by("period")
+
+
+def availability_matrix(vehicles, start, end):
+    """
+    Booked days of ``vehicles`` between ``start`` and ``end`` (inclusive),
+    run-length encoded as ``[offset, length]`` pairs relative to ``start``.
+
+    All periods come back from a single aggregated query; the window is
+    pushed into the join so only overlapping reservations are read.
+    """
+    window = reservation_period(start, end)
+    rows = (
+        vehicles
+        .annotate(window_reservations=FilteredRelation(
+            "reservations",
+            condition=Q(reservations__is_active=True, reservations__period__overlap=window),
+        ))
+        .annotate(booked=ArrayAgg("window_reservations__period"))
+        .order_by("name", "id")
+        .values_list("id", "booked")
+    )
+
+    matrix = []
+    for vehicle_id, periods in rows:
+        runs = []
+        for period in sorted(p for p in periods or [] if p is not None):
+            first = (max(period.lower, window.lower) - start).days
+            last = (min(period.upper, window.upper) - start).days
+            if runs and runs[-1][0] + runs[-1][1] == first:
+                runs[-1][1] += last - first  # back-to-back reservations
+            else:
+                runs.append([first, last - first])
+        matrix.append({"id": vehicle_id, "booked": runs})
+    return matrix
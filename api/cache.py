@@ -0,0 +1,47 @@
+"""
+Version counters for cache invalidation.
+
+Cached entries embed the current version of every scope they were built
+from. Writers bump the version instead of hunting down derived keys; stale
+entries are then never read again and simply age out on their TTL.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def model_scope(model):
+    """Version scope covering every row of ``model``, e.g. ``model:api.vehicle``."""
+    return f"model:{model._meta.label_lower}"
+
+
+def _version_key(scope):
+    return f"version:{scope}"
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # seed from the clock so a lost counter never rewinds onto old entries
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            get_version(scope)
+
+
+def bump_version_on_commit(*scopes):
+    """
+    Bump ``scopes`` once the current transaction commits. Bumping earlier
+    lets a reader rebuild the entry from the still-uncommitted old rows and
+    cache it under the new version, where it would then stick.
+    """
+    transaction.on_commit(lambda: bump_version(*scopes))
@@ -0,0 +1,69 @@
+"""
+Pre-rendered catalog listings.
+
+Popular vehicles and featured safaris are cached as the JSON bytes the API
+sends, under keys that embed the version of every model they are rendered
+from. Saving or deleting any of those rows bumps its model's version, so
+the next read renders afresh and stale entries just age out. The endpoints
+and warm_featured_cache both go through the functions below, so warming
+fills exactly the keys the endpoints read.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .cache import get_version, model_scope
+from .expansion import expand_queryset
+from .models import VehicleCategory, Vehicle, VehicleReservation, SafariPackage, SafariItinerary
+from .serializers import VehicleSerializer, SafariPackageSerializer
+
+CATALOG_TIMEOUT = 60 * 60  # versioned keys never go stale; this only bounds memory
+CATALOG_LIMIT = 10
+
+POPULAR_VEHICLES_EXPAND = {"category": {}, "availabilities": {}}
+FEATURED_SAFARIS_EXPAND = {"itinerary": {}}
+
+
+def catalog_key(name, models, *parts):
+    versions = ".".join(str(get_version(model_scope(model))) for model in models)
+    return ":".join(["catalog", name, versions, *map(str, parts)])
+
+
+def cached_json(key, render):
+    content = cache.get(key)
+    if content is None:
+        content = JSONRenderer().render(render())
+        cache.set(key, content, CATALOG_TIMEOUT)
+    return content
+
+
+def popular_vehicles_json():
+    """Most booked available vehicles, with their category and upcoming reservations."""
+    def render():
+        vehicles = expand_queryset(
+            Vehicle.objects.filter(is_available=True)
+            .annotate(bookings_count=Count("booking"))
+            .order_by("-bookings_count", "name"),
+            VehicleSerializer, POPULAR_VEHICLES_EXPAND,
+        )[:CATALOG_LIMIT]
+        return VehicleSerializer(vehicles, many=True, expand=POPULAR_VEHICLES_EXPAND).data
+
+    # the reservation window starts today, so the key rolls over daily
+    key = catalog_key(
+        "popular_vehicles", [VehicleCategory, Vehicle, VehicleReservation], timezone.localdate()
+    )
+    return cached_json(key, render)
+
+
+def featured_safaris_json():
+    """Safaris flagged ``is_featured``, with their itinerary."""
+    def render():
+        safaris = expand_queryset(
+            SafariPackage.objects.filter(is_featured=True).order_by("name"),
+            SafariPackageSerializer, FEATURED_SAFARIS_EXPAND,
+        )[:CATALOG_LIMIT]
+        return SafariPackageSerializer(safaris, many=True, expand=FEATURED_SAFARIS_EXPAND).data
+
+    key = catalog_key("featured_safaris", [SafariPackage, SafariItinerary])
+    return cached_json(key, render)
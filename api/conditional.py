@@ -0,0 +1,102 @@
+"""
+Conditional GETs (ETag / Last-Modified).
+
+Validators are worked out without rendering anything: lists are tagged with
+the version counters of the catalog models they read, details with the
+row's ``updated_at`` (one indexed lookup, which also runs the object
+permission checks). A matching ``If-None-Match`` or
+``If-Modified-Since`` gets a 304 before the serializer runs.
+"""
+import functools
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_version, model_scope
+from .expansion import ExpandableFieldsMixin, request_paths
+from .signals import CATALOG_MODELS
+
+
+def rendered_models(serializer_class, expand):
+    """Models whose rows end up in ``serializer_class``'s output for ``expand``."""
+    models = {serializer_class.Meta.model}
+    if issubclass(serializer_class, ExpandableFieldsMixin):
+        for name, (nested_class, _) in serializer_class.get_expandable_fields().items():
+            if name in expand:
+                models |= rendered_models(nested_class, expand[name])
+    return models
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:32])
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin adding validators to ``list`` and ``retrieve``.
+
+    ``conditional_models`` lists the models a list response depends on
+    beyond the expanded ones (e.g. those its filters read); lists are only
+    tagged when set. Responses that render a model without a version
+    counter are left unconditional.
+    """
+    conditional_models = ()
+
+    def _versions(self, models):
+        if not set(models) <= set(CATALOG_MODELS):
+            return None
+        return [get_version(model_scope(model)) for model in sorted(models, key=lambda model: model._meta.label)]
+
+    def _respond(self, request, handler, etag, last_modified=None):
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = handler()
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        handler = functools.partial(super().list, request, *args, **kwargs)
+        if not self.conditional_models:
+            return handler()
+        _, expand = request_paths(request)
+        models = rendered_models(self.get_serializer_class(), expand) | set(self.conditional_models)
+        versions = self._versions(models)
+        if versions is None:
+            return handler()
+        # the default availability window moves with the date
+        etag = make_etag(request.get_full_path(), timezone.localdate(), *versions)
+        return self._respond(request, handler, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        handler = functools.partial(super().retrieve, request, *args, **kwargs)
+        _, expand = request_paths(request)
+        serializer_class = self.get_serializer_class()
+        related = rendered_models(serializer_class, expand) - {serializer_class.Meta.model}
+        versions = self._versions(related)
+        if versions is None:
+            return handler()
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None)
+            .prefetch_related(None)
+            .only("pk", "updated_at")
+            .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .first()
+        )
+        if obj is None:
+            return handler()  # let retrieve produce the 404
+        # a 304 confirms the row exists and is unchanged: only for those allowed to see it
+        self.check_object_permissions(request, obj)
+        updated_at = obj.updated_at
+        etag = make_etag(request.get_full_path(), updated_at.isoformat(), timezone.localdate(), *versions)
+        # Last-Modified only describes the row itself, not expanded relations
+        last_modified = None if related else int(updated_at.timestamp())
+        return self._respond(request, handler, etag, last_modified)
@@ -0,0 +1,132 @@
+"""
+Outgoing email.
+
+Tasks don't talk to the mail server themselves. ``queue_email`` renders a
+template into an OutgoingEmail row, inside the caller's transaction, so a
+rolled back booking never mails anyone, and schedules a drain a few seconds
+later. The send_queued_emails task then delivers pending rows in batches
+over one backend connection, so a burst of confirmations costs one SMTP/TLS
+handshake instead of one per message. While a drain is scheduled, further
+messages just join its batch. Rows are claimed and settled in short
+transactions of their own; nothing holds a lock while mail is being sent.
+"""
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+DRAIN_SCHEDULED_KEY = "emails:drain-scheduled"
+
+
+def render_email(template_name, context):
+    """``(subject, body)`` from ``emails/<name>_subject.txt`` and ``emails/<name>.txt``."""
+    subject = render_to_string(f"emails/{template_name}_subject.txt", context)
+    body = render_to_string(f"emails/{template_name}.txt", context)
+    # headers can't hold newlines
+    return " ".join(subject.split()), body.strip()
+
+
+def queue_email(template_name, context, to):
+    subject, body = render_email(template_name, context)
+    outgoing = OutgoingEmail.objects.create(to=list(to), subject=subject, body=body)
+    transaction.on_commit(schedule_drain)
+    return outgoing
+
+
+def schedule_drain():
+    """Start a drain in EMAIL_BATCH_DELAY seconds unless one is already due."""
+    if cache.add(DRAIN_SCHEDULED_KEY, 1, settings.EMAIL_BATCH_DELAY):
+        from .tasks import send_queued_emails  # tasks import this module
+
+        send_queued_emails.apply_async(countdown=settings.EMAIL_BATCH_DELAY)
+
+
+def claim_batch(batch_size, exclude=()):
+    """
+    Lease up to ``batch_size`` pending rows to this drain and return them.
+    The claim commits straight away, so no lock or transaction stays open
+    while the mail server is talked to; a lease that is never settled (the
+    worker died) runs out after EMAIL_CLAIM_TIMEOUT and the row is sent again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        outgoing = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now), status="pending")
+            .exclude(pk__in=exclude)
+            .order_by("created_at")[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in outgoing]).update(
+            claimed_until=now + timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+        )
+    return outgoing
+
+
+def _dropped(exc):
+    """Whether ``exc`` lost the mail server session rather than rejecting one message."""
+    # SMTPException subclasses OSError, but only a disconnect among them ends the session
+    return isinstance(exc, smtplib.SMTPServerDisconnected) or (
+        isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+    )
+
+
+def send_batch(outgoing, connection):
+    """
+    Send claimed ``outgoing`` rows over the open ``connection`` and return
+    ``(sent, failed_pks, released_pks)``. Delivered rows are deleted. Rows
+    the server rejected count an attempt and are released for a later
+    drain. A dropped session is reopened once; rows it still can't carry
+    are released without counting an attempt. Call outside a transaction.
+    """
+    sent, failures, released = [], {}, []
+    reconnects = 1
+
+    def deliver(message):
+        nonlocal reconnects
+        try:
+            connection.send_messages([message])
+        except Exception as exc:
+            if not (_dropped(exc) and reconnects):
+                raise
+            reconnects -= 1
+            # open() is a no-op while the dead session is still attached
+            connection.close()
+            connection.open()
+            connection.send_messages([message])
+
+    for email in outgoing:
+        if released:  # the session is gone for good: leave the rest to a later drain
+            released.append(email.pk)
+            continue
+        message = EmailMessage(email.subject, email.body, settings.DEFAULT_FROM_EMAIL, email.to)
+        # one message per call, so a rejected recipient fails only its own row
+        try:
+            deliver(message)
+        except Exception as exc:
+            if _dropped(exc):
+                released.append(email.pk)
+            else:
+                failures[email.pk] = f"{type(exc).__name__}: {exc}"
+        else:
+            sent.append(email.pk)
+
+    with transaction.atomic():
+        OutgoingEmail.objects.filter(pk__in=sent).delete()
+        OutgoingEmail.objects.filter(pk__in=released).update(claimed_until=None)
+        for pk, error in failures.items():
+            OutgoingEmail.objects.filter(pk=pk).update(
+                attempts=F("attempts") + 1, last_error=error, claimed_until=None
+            )
+        if failures:
+            OutgoingEmail.objects.filter(
+                pk__in=failures, attempts__gte=settings.EMAIL_MAX_ATTEMPTS
+            ).update(status="failed")
+    return len(sent), list(failures), released
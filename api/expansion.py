@@ -0,0 +1,120 @@
+"""
+Sparse fieldsets and opt-in expansion.
+
+Serializers emit related objects as their primary key. ``?expand=`` swaps
+them for nested objects (``?expand=vehicle.category,safari``) and
+``?fields=`` trims the output (``?fields=id,status,vehicle.name``); dotted
+paths reach into expanded objects. ExpandableQuerysetMixin reads the same
+parameters, so only relations that are actually rendered get joined or
+prefetched. Both only shape output: on writes (POST/PUT/PATCH) the
+serializer keeps all its fields, so a stray ``?fields=`` can't drop input.
+"""
+from django.db.models import Prefetch
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def parse_paths(value):
+    """``"a,b.c"`` -> ``{"a": {}, "b": {"c": {}}}``"""
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split("."))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def renders_only(request):
+    """True unless ``request`` writes through the serializer."""
+    return request is None or request.method in SAFE_METHODS
+
+
+def request_paths(request):
+    """The ``(fields, expand)`` trees asked for by ``request``."""
+    if request is None:
+        return {}, {}
+    params = request.query_params
+    return parse_paths(params.get(FIELDS_PARAM)), parse_paths(params.get(EXPAND_PARAM))
+
+
+class ExpandableFieldsMixin:
+    """
+    ``Meta.expandable_fields`` maps a field name to a serializer class or a
+    ``(serializer class, options)`` pair. Options go to the nested
+    serializer, except ``prefetch``: a callable taking the request and
+    returning the queryset to prefetch a to-many relation with.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if fields is None and expand is None and (self.read_only or renders_only(request)):
+            fields, expand = request_paths(request)
+        self._fields_tree = fields or {}
+        self._expand_tree = expand or {}
+
+    @classmethod
+    def get_expandable_fields(cls):
+        expandable = {}
+        for name, spec in getattr(cls.Meta, "expandable_fields", {}).items():
+            serializer_class, options = spec if isinstance(spec, tuple) else (spec, {})
+            expandable[name] = (serializer_class, options)
+        return expandable
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, (serializer_class, options) in self.get_expandable_fields().items():
+            if name in self._expand_tree:
+                options = {key: value for key, value in options.items() if key != "prefetch"}
+                fields[name] = serializer_class(
+                    read_only=True, fields=self._fields_tree.get(name), expand=self._expand_tree[name], **options
+                )
+        if self._fields_tree:
+            wanted = self._fields_tree.keys() | self._expand_tree.keys()
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        return fields
+
+    @classmethod
+    def related_lookups(cls, expand, request=None, prefix="", many=False):
+        """``select_related`` and ``prefetch_related`` lookups needed to render ``expand``."""
+        select, prefetch = [], []
+        for name, (serializer_class, options) in cls.get_expandable_fields().items():
+            if name not in expand:
+                continue
+            path = prefix + options.get("source", name)
+            # below a to-many relation everything has to be prefetched
+            nested_many = many or options.get("many", False)
+            if nested_many:
+                queryset = options.get("prefetch")
+                prefetch.append(Prefetch(path, queryset=queryset(request) if queryset else None))
+            else:
+                select.append(path)
+            if issubclass(serializer_class, ExpandableFieldsMixin):
+                nested_select, nested_prefetch = serializer_class.related_lookups(
+                    expand[name], request, f"{path}__", nested_many
+                )
+                select += nested_select
+                prefetch += nested_prefetch
+        return select, prefetch
+
+
+def expand_queryset(queryset, serializer_class, expand, request=None):
+    """Join or prefetch exactly the relations ``serializer_class`` renders for ``expand``."""
+    if not issubclass(serializer_class, ExpandableFieldsMixin):
+        return queryset
+    select, prefetch = serializer_class.related_lookups(expand, request)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class ExpandableQuerysetMixin:
+    """Viewset mixin fetching the relations requested with ``?expand=``."""
+
+    def get_queryset(self):
+        _, expand = request_paths(self.request) if renders_only(self.request) else ({}, {})
+        return expand_queryset(super().get_queryset(), self.get_serializer_class(), expand, self.request)
@@ -0,0 +1,106 @@
+"""
+Facet counts for the catalog search page.
+
+Every facet of a model comes out of one GROUP BY over the filtered
+queryset: rows are grouped on all facet dimensions at once (category x
+seat band x price bucket, ...) and the per-facet totals are summed up in
+Python, since the number of combinations stays small. Results are cached
+as rendered JSON under the normalized filter parameters and the catalog
+versions, like the other catalog listings.
+"""
+import hashlib
+import re
+from collections import Counter
+
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from rest_framework.exceptions import ValidationError
+
+from .catalog import cached_json, catalog_key
+
+# bucket edges: each bucket is [edge, next edge), the first and last are open-ended
+VEHICLE_SEAT_BANDS = (5, 8, 13)
+VEHICLE_PRICE_BUCKETS = (100_000, 200_000, 350_000, 500_000)  # UGX per day
+SAFARI_PRICE_BUCKETS = (500_000, 1_000_000, 2_500_000, 5_000_000)  # UGX per person
+SAFARI_DURATION_BANDS = (3, 5, 8)  # days
+
+
+def _bucket(field, edges):
+    return Case(
+        *[When(**{f"{field}__lt": edge}, then=Value(index)) for index, edge in enumerate(edges)],
+        default=Value(len(edges)),
+        output_field=IntegerField(),
+    )
+
+
+def _buckets(counts, edges):
+    bounds = zip((None, *edges), (*edges, None))
+    return [{"min": low, "max": high, "count": counts[index]} for index, (low, high) in enumerate(bounds)]
+
+
+def _values(counts):
+    return [{"value": value, "count": count} for value, count in sorted(counts.items())]
+
+
+def _grouped(queryset, **dimensions):
+    """Sum ``COUNT(*) GROUP BY <all dimensions>`` into one Counter per dimension."""
+    totals = {name: Counter() for name in dimensions}
+    rows = queryset.order_by().values(**dimensions).annotate(facet_count=Count("pk"))
+    for row in rows:
+        for name in dimensions:
+            totals[name][row[name]] += row["facet_count"]
+    return totals
+
+
+def vehicle_facets(queryset):
+    totals = _grouped(
+        queryset,
+        category_name=F("category__name"),
+        seats_band=_bucket("seats", VEHICLE_SEAT_BANDS),
+        price_bucket=_bucket("daily_rate", VEHICLE_PRICE_BUCKETS),
+    )
+    return {
+        "count": sum(totals["category_name"].values()),
+        "facets": {
+            "category": _values(totals["category_name"]),
+            "seats": _buckets(totals["seats_band"], VEHICLE_SEAT_BANDS),
+            "daily_rate": _buckets(totals["price_bucket"], VEHICLE_PRICE_BUCKETS),
+        },
+    }
+
+
+def safari_facets(queryset):
+    totals = _grouped(
+        queryset,
+        region_name=F("region"),
+        price_bucket=_bucket("base_price", SAFARI_PRICE_BUCKETS),
+        duration_band=_bucket("duration_days", SAFARI_DURATION_BANDS),
+    )
+    return {
+        "count": sum(totals["region_name"].values()),
+        "facets": {
+            "region": _values(totals["region_name"]),
+            "base_price": _buckets(totals["price_bucket"], SAFARI_PRICE_BUCKETS),
+            "duration_days": _buckets(totals["duration_band"], SAFARI_DURATION_BANDS),
+        },
+    }
+
+
+def cached_facets(view, compute, models):
+    """
+    Facets of ``view``'s filtered queryset as JSON bytes, cached under the
+    validated filter values (so ``?category=SUV`` and ``?category=suv``
+    share an entry) and the versions of ``models``.
+    """
+    request = view.request
+    filterset = view.filterset_class(request.query_params, queryset=view.get_queryset(), request=request)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    params = sorted(
+        (name, str(value).lower()) for name, value in filterset.form.cleaned_data.items()
+        if value not in (None, "")
+    )
+    search = " ".join(re.findall(r"\w+", request.query_params.get("search", "").lower()))
+    digest = hashlib.sha256(repr((params, search)).encode()).hexdigest()[:32]
+
+    key = catalog_key(f"facets:{filterset.queryset.model._meta.model_name}", models, digest)
+    return cached_json(key, lambda: compute(view.filter_queryset(view.get_queryset())))
@@ -1,5 +1,18 @@
 import django_filters
-from .models import Vehicle, SafariPackage
+from django import forms
+from django.db.models import Exists, OuterRef
+from .availability import reservation_period
+from .models import Vehicle, VehicleReservation, SafariPackage
+
+
+class VehicleFilterForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("available_from"), cleaned_data.get("available_to")
+        if start and end and end < start:
+            raise forms.ValidationError("available_to must be on or after available_from")
+        return cleaned_data
+
 
 class VehicleFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name="daily_rate", lookup_expr='gte')
@@ -8,14 +21,31 @@ class VehicleFilter(django_filters.FilterSet):
     max_seats = django_filters.NumberFilter(field_name="seats", lookup_expr='lte')
     category = django_filters.CharFilter(field_name='category__name', lookup_expr='iexact')
     available_on = django_filters.DateFilter(method='filter_available_on')
+    available_from = django_filters.DateFilter(method='filter_available_range')
+    available_to = django_filters.DateFilter(method='filter_available_range')
 
     class Meta:
         model = Vehicle
-        fields = ['category', 'min_price', 'max_price', 'min_seats', 'max_seats', 'available_on']
+        form = VehicleFilterForm
+        fields = ['category', 'min_price', 'max_price', 'min_seats', 'max_seats',
+                  'available_on', 'available_from', 'available_to']
 
     def filter_available_on(self, queryset, name, value):
-        # exclude vehicles that have an availability record showing booked on that date
-        return queryset.exclude(availabilities__date=value, availabilities__is_booked=True)
+        # exclude vehicles with an active reservation covering that date
+        return queryset.exclude(Exists(VehicleReservation.objects.filter(
+            vehicle=OuterRef("pk"), is_active=True, period__contains=value
+        )))
+
+    def filter_available_range(self, queryset, name, value):
+        start = self.form.cleaned_data.get("available_from")
+        end = self.form.cleaned_data.get("available_to")
+        if name == "available_to" and start:
+            return queryset  # already applied together with available_from
+        # a single correlated NOT EXISTS, served by the (vehicle, period) GiST
+        # index that backs the reservation exclusion constraint
+        return queryset.filter(~Exists(VehicleReservation.objects.filter(
+            vehicle=OuterRef("pk"), is_active=True, period__overlap=reservation_period(start or end, end or start)
+        )))
 
 
 class SafariFilter(django_filters.FilterSet):
@@ -0,0 +1,35 @@
+"""
+Expiry of pending booking holds.
+
+A pending booking claims vehicle days and safari seats the moment it is
+created. If payment never completes, the sweeper marks it expired and hands
+the inventory back in a fixed number of set-based statements per batch.
+"""
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .cache import bump_version_on_commit, model_scope
+from .models import Booking, SafariDeparture, VehicleReservation
+
+
+def hold_deadline():
+    return timezone.now() + settings.BOOKING_HOLD_TTL
+
+
+def expire_bookings(booking_ids):
+    """Expire ``booking_ids`` and return their days and seats. Call inside a transaction."""
+    seat_holds = Booking.objects.filter(
+        pk__in=booking_ids, booking_type="safari",
+        safari_id=OuterRef("safari_id"), start_date=OuterRef("departure_date"),
+    )
+    SafariDeparture.objects.filter(Exists(seat_holds)).update(
+        seats_available=F("seats_available") + Subquery(
+            seat_holds.values("safari_id").annotate(pax=Sum("pax")).values("pax")
+        )
+    )
+    VehicleReservation.objects.filter(booking_id__in=booking_ids, is_active=True).update(is_active=False)
+    expired = Booking.objects.filter(pk__in=booking_ids).update(status="expired", updated_at=timezone.now())
+    # queryset updates skip post_save, so invalidate by hand
+    bump_version_on_commit("availability", model_scope(VehicleReservation))
+    return expired
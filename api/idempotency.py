@@ -0,0 +1,111 @@
+"""
+Idempotent replay for unsafe DRF actions.
+
+Clients send an ``Idempotency-Key`` header (older clients put
+``idempotency_key`` in the body). The first request for a (user, key) pair
+runs normally and its rendered response is stored in Redis; retries get the
+stored bytes back unchanged. While that first request is still running, an
+in-flight lock makes duplicates wait for its result instead of racing it
+into Postgres.
+"""
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+LOCK_TIMEOUT = 30  # seconds an in-flight request may hold the key
+WAIT_TIMEOUT = 10  # seconds a duplicate waits for the original
+POLL_INTERVAL = 0.05
+
+
+def get_idempotency_key(request):
+    key = request.headers.get("Idempotency-Key")
+    if not key and hasattr(request.data, "get"):
+        key = request.data.get("idempotency_key")
+    return str(key)[:255] if key else None
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _wait_for(cache_key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return stored
+        if cache.get(f"{cache_key}:lock") is None:
+            return cache.get(cache_key)
+    return None
+
+
+def _replay(stored):
+    response = HttpResponse(stored["content"], status=stored["status"], content_type=stored["content_type"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view_method):
+    """Decorate a viewset action so retries with the same key replay the first response."""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = get_idempotency_key(request)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        scope = f"{request.user.pk}:{self.basename}:{self.action}:{key}"
+        cache_key = f"idempotency:{hashlib.sha256(scope.encode()).hexdigest()}"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is None:
+            locked = cache.add(f"{cache_key}:lock", 1, LOCK_TIMEOUT)
+            if locked is None:
+                # cache unreachable (errors are swallowed into None): run unguarded
+                # and let the (user, idempotency_key) constraint stop duplicates
+                return view_method(self, request, *args, **kwargs)
+            if locked:
+                try:
+                    response = self.finalize_response(request, view_method(self, request, *args, **kwargs), *args, **kwargs)
+                    response.render()
+                    if response.status_code < 500:
+                        cache.set(cache_key, {
+                            "fingerprint": fingerprint,
+                            "status": response.status_code,
+                            "content_type": response["Content-Type"],
+                            "content": response.content,
+                        }, settings.IDEMPOTENCY_TTL)
+                    return response
+                finally:
+                    cache.delete(f"{cache_key}:lock")
+            stored = _wait_for(cache_key)
+            if stored is None:
+                return Response(
+                    {"detail": "A request with this idempotency key is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+        if stored["fingerprint"] != fingerprint:
+            return Response(
+                {"detail": "This idempotency key was already used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return _replay(stored)
+    return wrapper
+
+
+class IdempotentCreateMixin:
+    """Makes ``create`` idempotent; other actions opt in with ``@idempotent``."""
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
@@ -0,0 +1,90 @@
+"""
+Invoice PDFs.
+
+Rendering works on plain ``(booking_id, amount, currency)`` tuples with a
+stylesheet built once per process, so the same function serves a single
+payment in a Celery task and a process pool during backfills.
+``publish_invoices`` uploads each PDF as soon as it is rendered, on a thread
+pool sharing the process's pooled S3 client, so rendering and uploading
+overlap.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+from utils.s3 import get_s3_client
+
+from .models import Invoice
+
+UPLOAD_THREADS = 16
+
+
+@lru_cache(maxsize=None)
+def _styles():
+    return getSampleStyleSheet()
+
+
+def invoice_data(payment):
+    """What ``render_invoice_pdf`` needs, as picklable values."""
+    return str(payment.booking_id), str(payment.amount), payment.currency
+
+
+def render_invoice_pdf(booking_id, amount, currency):
+    normal = _styles()["Normal"]
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer).build([
+        Paragraph(f"Invoice for booking {booking_id}", normal),
+        Paragraph(f"Amount: {amount} {currency}", normal),
+    ])
+    return buffer.getvalue()
+
+
+def invoice_key(payment):
+    return f"invoices/{payment.transaction_ref}.pdf"
+
+
+def invoice_url(key):
+    return f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{key}"
+
+
+def upload_invoice(key, pdf_bytes, client=None):
+    (client or get_s3_client()).put_object(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=key,
+        Body=pdf_bytes,
+        ContentType="application/pdf",
+    )
+
+
+def publish_invoices(payments, render_map=map, client=None, on_progress=None):
+    """
+    Render and upload the invoices of ``payments``; returns ``{payment pk: pdf url}``.
+
+    ``render_map`` runs the rendering (``ProcessPoolExecutor.map`` to use
+    several cores); ``on_progress(done, total)`` is called after each upload.
+    """
+    if not payments:
+        return {}
+    keys = {payment.pk: invoice_key(payment) for payment in payments}
+    pdfs = render_map(render_invoice_pdf, *zip(*(invoice_data(payment) for payment in payments)))
+    threads = min(UPLOAD_THREADS, settings.AWS_S3_MAX_POOL_CONNECTIONS)
+    with ThreadPoolExecutor(threads) as uploads:
+        # pdfs is lazy: each upload starts as soon as its PDF is ready
+        futures = [uploads.submit(upload_invoice, key, pdf, client) for key, pdf in zip(keys.values(), pdfs)]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if on_progress:
+                on_progress(done, len(futures))
+    return {pk: invoice_url(key) for pk, key in keys.items()}
+
+
+def record_invoices(urls):
+    """Create or update the Invoice rows for ``{payment pk: pdf url}`` in one statement."""
+    Invoice.objects.bulk_create(
+        [Invoice(payment_id=pk, pdf_url=url) for pk, url in urls.items()],
+        update_conflicts=True, unique_fields=["payment"], update_fields=["pdf_url"],
+    )
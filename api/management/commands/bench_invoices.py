@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import boto3
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+from api.invoices import invoice_key, publish_invoices
+from api.models import Payment
+from utils.s3 import build_s3_client
+
+BUCKET = "invoice-bench"
+CREDENTIALS = {"aws_access_key_id": "bench", "aws_secret_access_key": "bench", "region_name": "us-east-1"}
+
+
+class _StubS3(ThreadingHTTPServer):
+    """Accepts PutObject over keep-alive connections, after ``latency`` seconds, and remembers the keys."""
+
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), _StubS3Handler)
+        self.latency = latency
+        self.keys = set()
+        self.keys_lock = threading.Lock()
+
+    @property
+    def endpoint_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class _StubS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        with self.server.keys_lock:
+            self.server.keys.add(self.path)
+        self.send_response(200)
+        self.send_header("ETag", '"stub"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _warm_up(_):
+    pass
+
+
+def _publish_one_by_one(payments, endpoint_url):
+    """What generate_invoice_and_email did per payment: fresh styles, document and S3 client."""
+    for payment in payments:
+        buffer = BytesIO()
+        styles = getSampleStyleSheet()
+        SimpleDocTemplate(buffer).build([
+            Paragraph(f"Invoice for booking {payment.booking_id}", styles["Normal"]),
+            Paragraph(f"Amount: {payment.amount} {payment.currency}", styles["Normal"]),
+        ])
+        boto3.client("s3", endpoint_url=endpoint_url, **CREDENTIALS).put_object(
+            Bucket=BUCKET, Key=invoice_key(payment), Body=buffer.getvalue(), ContentType="application/pdf",
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure invoice throughput against a local S3 stand-in: the old one-at-a-time path "
+        "versus publish_invoices rendering in-process and on process pools of different sizes. Touches no database or real bucket."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=500)
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+        parser.add_argument("--latency-ms", type=float, default=20, help="Simulated S3 round trip")
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        payments = [
+            Payment(booking_id=uuid.uuid4(), amount=Decimal(150000 + n), transaction_ref=f"BENCH-{n:06d}")
+            for n in range(count)
+        ]
+        stub = _StubS3(options["latency_ms"] / 1000)
+        threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+        def run(label, publish, baseline=None):
+            stub.keys.clear()
+            started = time.perf_counter()
+            publish()
+            elapsed = time.perf_counter() - started
+            if len(stub.keys) != count:
+                raise CommandError(f"{label}: the stub received {len(stub.keys)} of {count} invoices")
+            speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+            self.stdout.write(f"{label}: {count / elapsed:.1f} invoices/s{speedup}")
+            return elapsed
+
+        try:
+            with override_settings(AWS_STORAGE_BUCKET_NAME=BUCKET):
+                baseline = run("one by one", lambda: _publish_one_by_one(payments, stub.endpoint_url))
+                client = build_s3_client(endpoint_url=stub.endpoint_url, **CREDENTIALS)
+                run("pipeline, rendering in-process", lambda: publish_invoices(payments, client=client), baseline)
+                for workers in options["workers"]:
+                    with ProcessPoolExecutor(
+                        workers, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+                    ) as pool:
+                        # keep process start-up out of the timing
+                        list(pool.map(_warm_up, range(workers * 4)))
+                        run(
+                            f"pipeline, {workers} render processes",
+                            lambda: publish_invoices(payments, render_map=pool.map, client=client),
+                            baseline,
+                        )
+        finally:
+            stub.shutdown()
+            stub.server_close()
@@ -0,0 +1,86 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import VehicleCategory, Vehicle, SafariPackage
+from api.row_rendering import compile_row_renderer
+from api.serializers import VehicleSerializer, SafariPackageSerializer
+
+
+def _seed(rows):
+    category = VehicleCategory.objects.create(name="Benchmark")
+    Vehicle.objects.bulk_create([
+        Vehicle(
+            category=category, name=f"Vehicle {n:05d}", description="Benchmark vehicle " * 8,
+            seats=4 + n % 5, daily_rate=Decimal(90 + n % 40) + Decimal("0.5"),
+            with_driver=bool(n % 2), image=f"vehicles/{n}.jpg" if n % 3 else "",
+        )
+        for n in range(rows)
+    ], batch_size=1000)
+    SafariPackage.objects.bulk_create([
+        SafariPackage(
+            name=f"Safari {n:05d}", description="Benchmark safari " * 8, region="Bwindi",
+            duration_days=1 + n % 7, base_price=Decimal(500 + n % 300), seats_available=12,
+            image=f"safaris/{n}.jpg" if n % 2 else None, is_featured=not n % 10,
+        )
+        for n in range(rows)
+    ], batch_size=1000)
+
+
+def _best_of(repeat, render):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = render()
+        timings.append(time.perf_counter() - started)
+    return min(timings), data
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the .values() list path against the catalog serializers. Seeds rows inside a "
+        "transaction that is rolled back; output parity is covered by api/tests/test_row_rendering.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--fields", action="append", default=None,
+            help="Extra ?fields= variants to time, e.g. --fields id,name,daily_rate",
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        variants = [""] + (options["fields"] or [])
+        for rows in options["rows"]:
+            with transaction.atomic():
+                _seed(rows)
+                for serializer_class in (VehicleSerializer, SafariPackageSerializer):
+                    model = serializer_class.Meta.model
+                    for fields in variants:
+                        # a host that passes ALLOWED_HOSTS when image URLs are made absolute
+                        request = Request(APIRequestFactory().get(
+                            "/", {"fields": fields} if fields else {}, SERVER_NAME="localhost",
+                        ))
+                        queryset = model.objects.order_by("name")
+
+                        slow, _ = _best_of(options["repeat"], lambda: renderer.render(serializer_class(
+                            queryset, many=True, context={"request": request}
+                        ).data))
+                        columns, render = compile_row_renderer(serializer_class(context={"request": request}))
+                        fast, _ = _best_of(options["repeat"], lambda: renderer.render([
+                            render(row) for row in queryset.values(*columns)
+                        ]))
+
+                        label = f"{serializer_class.__name__}{f' fields={fields}' if fields else ''} x{rows}"
+                        self.stdout.write(
+                            f"{label}: serializer {slow * 1000:.1f} ms, values {fast * 1000:.1f} ms "
+                            f"({slow / fast:.1f}x)"
+                        )
+                transaction.set_rollback(True)
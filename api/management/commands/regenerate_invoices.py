@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.invoices import publish_invoices, record_invoices
+from api.models import Payment
+from api.tasks import regenerate_invoices
+
+
+def _date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD.")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate the invoice PDFs of payments made between two dates, without emailing customers. "
+        "Renders on a local process pool, or queues chunks for the invoice workers with --celery."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", type=_date, required=True, help="YYYY-MM-DD, inclusive")
+        parser.add_argument("--to", dest="date_to", type=_date, required=True, help="YYYY-MM-DD, inclusive")
+        parser.add_argument("--status", default="success", help="Payment status to regenerate (default: success)")
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Rendering processes")
+        parser.add_argument("--celery", action="store_true", help="Queue the chunks instead of running them here")
+
+    def handle(self, *args, **options):
+        payment_ids = list(
+            Payment.objects.filter(
+                status=options["status"],
+                created_at__date__gte=options["date_from"],
+                created_at__date__lte=options["date_to"],
+            )
+            .order_by("created_at")
+            .values_list("pk", flat=True)
+        )
+        total, size = len(payment_ids), options["chunk_size"]
+        chunks = [payment_ids[start:start + size] for start in range(0, total, size)]
+        if not chunks:
+            self.stdout.write("No payments to regenerate.")
+            return
+
+        if options["celery"]:
+            for chunk in chunks:
+                result = regenerate_invoices.delay([str(pk) for pk in chunk])
+                self.stdout.write(f"queued {len(chunk)} invoices as task {result.id}")
+            self.stdout.write(self.style.SUCCESS(f"Queued {total} invoices in {len(chunks)} chunks."))
+            return
+
+        started = time.monotonic()
+        done = 0
+        # spawned workers only render, but importing api.invoices needs Django set up
+        with ProcessPoolExecutor(
+            options["workers"], mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+        ) as pool:
+            for chunk in chunks:
+                payments = list(Payment.objects.filter(pk__in=chunk).order_by("created_at"))
+                record_invoices(publish_invoices(payments, render_map=pool.map))
+                done += len(payments)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{done}/{total} invoices ({done / total:.0%}), {done / elapsed:.1f}/s")
+        self.stdout.write(self.style.SUCCESS(f"Regenerated {done} invoices in {time.monotonic() - started:.1f} s."))
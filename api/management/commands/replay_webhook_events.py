@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from api.models import WebhookEvent
+from api.webhooks import inbox_stats, replay
+
+
+class Command(BaseCommand):
+    help = "Put failed webhook events back in the inbox so process_webhook_events applies them again."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", help="Event ids (default: every failed event)")
+        parser.add_argument("--provider", help="Only events from this provider")
+        parser.add_argument("--since", type=parse_datetime, help="Only events received at or after this ISO datetime")
+
+    def handle(self, *args, **options):
+        events = WebhookEvent.objects.all()
+        if options["ids"]:
+            events = events.filter(pk__in=options["ids"])
+        if options["provider"]:
+            events = events.filter(provider=options["provider"])
+        if options["since"]:
+            events = events.filter(received_at__gte=options["since"])
+
+        with transaction.atomic():
+            replayed = replay(events)
+        self.stdout.write(self.style.SUCCESS(f"Replaying {replayed} events."))
+        self.stdout.write(f"Inbox: {inbox_stats()}")
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:21
+
+from collections import defaultdict
+from datetime import timedelta
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+import uuid
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.backends.postgresql.psycopg_any import DateRange
+
+
+def _runs(days):
+    """Collapse sorted dates into inclusive (start, end) runs of consecutive days."""
+    start = prev = days[0]
+    for day in days[1:]:
+        if day != prev + timedelta(days=1):
+            yield start, prev
+            start = day
+        prev = day
+    yield start, prev
+
+
+def availability_to_reservations(apps, schema_editor):
+    VehicleAvailability = apps.get_model("api", "VehicleAvailability")
+    VehicleReservation = apps.get_model("api", "VehicleReservation")
+    Booking = apps.get_model("api", "Booking")
+
+    booked = defaultdict(set)
+    for vehicle_id, day in VehicleAvailability.objects.filter(is_booked=True).values_list("vehicle_id", "date"):
+        booked[vehicle_id].add(day)
+
+    reservations = []
+    # bookings whose days are all still marked booked keep their link
+    live_bookings = Booking.objects.filter(
+        booking_type="vehicle", vehicle__isnull=False, status__in=["pending", "confirmed"]
+    ).order_by("created_at")
+    for booking in live_bookings.iterator():
+        end = booking.end_date or booking.start_date
+        days = {booking.start_date + timedelta(days=n) for n in range((end - booking.start_date).days + 1)}
+        if days <= booked[booking.vehicle_id]:
+            booked[booking.vehicle_id] -= days
+            reservations.append(VehicleReservation(
+                vehicle_id=booking.vehicle_id, booking_id=booking.pk,
+                period=DateRange(booking.start_date, end + timedelta(days=1), "[)"),
+            ))
+
+    # whatever is left becomes booking-less blocks
+    for vehicle_id, days in booked.items():
+        if not days:
+            continue
+        for start, end in _runs(sorted(days)):
+            reservations.append(VehicleReservation(
+                vehicle_id=vehicle_id, period=DateRange(start, end + timedelta(days=1), "[)"),
+            ))
+
+    VehicleReservation.objects.bulk_create(reservations, batch_size=500)
+
+
+def reservations_to_availability(apps, schema_editor):
+    VehicleAvailability = apps.get_model("api", "VehicleAvailability")
+    VehicleReservation = apps.get_model("api", "VehicleReservation")
+
+    rows = []
+    for reservation in VehicleReservation.objects.filter(is_active=True).iterator():
+        day = reservation.period.lower
+        while day < reservation.period.upper:
+            rows.append(VehicleAvailability(vehicle_id=reservation.vehicle_id, date=day, is_booked=True))
+            day += timedelta(days=1)
+    VehicleAvailability.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_alter_safaripackage_image_alter_vehicle_image'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='VehicleReservation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', django.contrib.postgres.fields.ranges.DateRangeField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservation', to='api.booking')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='api.vehicle')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='vehiclereservation',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('is_active', True)), expressions=[('vehicle', '='), ('period', '&&')], name='vehicle_reservation_no_overlap'),
+        ),
+        migrations.RunPython(availability_to_reservations, reservations_to_availability),
+        migrations.DeleteModel(
+            name='VehicleAvailability',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+def clear_duplicate_keys(apps, schema_editor):
+    # duplicates slipped through before the constraint; keep the oldest booking's key
+    Booking = apps.get_model("api", "Booking")
+    seen = set()
+    duplicates = []
+    rows = (
+        Booking.objects.filter(idempotency_key__isnull=False)
+        .order_by("created_at")
+        .values_list("pk", "user_id", "idempotency_key")
+    )
+    for pk, user_id, key in rows.iterator():
+        if (user_id, key) in seen:
+            duplicates.append(pk)
+        seen.add((user_id, key))
+    Booking.objects.filter(pk__in=duplicates).update(idempotency_key=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_vehicle_reservations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(clear_duplicate_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='unique_booking_idempotency_key'),
+        ),
+    ]
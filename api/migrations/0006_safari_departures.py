@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:25
+
+import django.db.models.deletion
+import uuid
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seats_per_departure(apps, schema_editor):
+    """
+    seats_available used to be one global counter decremented by every
+    booking. Restore it to the per-departure capacity and open a departure
+    row for each date that already has live bookings.
+    """
+    SafariPackage = apps.get_model("api", "SafariPackage")
+    SafariDeparture = apps.get_model("api", "SafariDeparture")
+    Booking = apps.get_model("api", "Booking")
+
+    booked = Booking.objects.filter(booking_type="safari", safari__isnull=False)
+    taken = dict(booked.values("safari_id").annotate(pax=Sum("pax")).values_list("safari_id", "pax"))
+    live = defaultdict(dict)
+    rows = (
+        booked.filter(status__in=["pending", "confirmed"])
+        .values("safari_id", "start_date").annotate(pax=Sum("pax"))
+    )
+    for row in rows:
+        live[row["safari_id"]][row["start_date"]] = row["pax"]
+
+    departures = []
+    for safari in SafariPackage.objects.filter(pk__in=taken):
+        safari.seats_available += taken[safari.pk]
+        safari.save(update_fields=["seats_available"])
+        for departure_date, pax in live[safari.pk].items():
+            departures.append(SafariDeparture(
+                safari_id=safari.pk, departure_date=departure_date,
+                seats_available=max(safari.seats_available - pax, 0),
+            ))
+    SafariDeparture.objects.bulk_create(departures, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_booking_idempotency_key_per_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SafariDeparture',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('departure_date', models.DateField()),
+                ('seats_available', models.IntegerField()),
+                ('safari', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='departures', to='api.safaripackage')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('safari', 'departure_date'), name='unique_safari_departure'), models.CheckConstraint(check=models.Q(('seats_available__gte', 0)), name='safari_departure_seats_non_negative')],
+            },
+        ),
+        migrations.RunPython(seats_per_departure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:27
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_booking_hold_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonalRate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('applies_to', models.CharField(choices=[('all', 'All'), ('vehicle', 'Vehicles'), ('safari', 'Safaris')], default='all', max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('multiplier', models.DecimalField(decimal_places=2, max_digits=4)),
+            ],
+        ),
+    ]
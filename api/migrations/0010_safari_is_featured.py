@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='safaripackage',
+            name='is_featured',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def updated_from_created(apps, schema_editor):
+    # rows that existed before change tracking: best guess is their creation time
+    for name in ("Vehicle", "SafariPackage", "Booking"):
+        apps.get_model("api", name).objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_safari_is_featured'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehiclecategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='safaripackage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='safariitinerary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(updated_from_created, migrations.RunPython.noop),
+    ]
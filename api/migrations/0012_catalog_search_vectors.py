@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Vehicle = apps.get_model("api", "Vehicle")
+    VehicleCategory = apps.get_model("api", "VehicleCategory")
+    SafariPackage = apps.get_model("api", "SafariPackage")
+
+    category_name = Subquery(VehicleCategory.objects.filter(pk=OuterRef("category_id")).values("name")[:1])
+    Vehicle.objects.update(search_vector=(
+        SearchVector("name", weight="A", config="english")
+        + SearchVector(category_name, weight="B", config="english")
+        + SearchVector("description", weight="C", config="english")
+    ))
+    SafariPackage.objects.update(search_vector=(
+        SearchVector("name", weight="A", config="english")
+        + SearchVector("region", weight="B", config="english")
+        + SearchVector("description", weight="C", config="english")
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='safaripackage',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='safaripackage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='safari_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vehicle_search_idx'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:40
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def backfill_ratings(apps, schema_editor):
+    Review = apps.get_model("api", "Review")
+    for model_name, fk in (("Vehicle", "vehicle"), ("SafariPackage", "safari")):
+        model = apps.get_model("api", model_name)
+        rows = (
+            Review.objects.filter(**{f"{fk}__isnull": False}).order_by()
+            .values(fk).annotate(count=Count("pk"), average=Avg("rating"))
+        )
+        for row in rows:
+            model.objects.filter(pk=row[fk]).update(
+                review_count=row["count"], average_rating=round(row["average"], 2)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_catalog_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='safaripackage',
+            name='average_rating',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='safaripackage',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='average_rating',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='safaripackage',
+            index=models.Index(fields=['average_rating', 'id'], name='safari_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['average_rating', 'id'], name='vehicle_rating_idx'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
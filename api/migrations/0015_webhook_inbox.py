@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:52
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('provider', models.CharField(max_length=50)),
+                ('dedupe_key', models.CharField(max_length=200)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'processed'), _negated=True), fields=['status', 'received_at'], name='webhook_event_unprocessed_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'dedupe_key'), name='webhook_event_dedupe')],
+            },
+        ),
+    ]
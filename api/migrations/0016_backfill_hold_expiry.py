@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F
+
+
+def hold_from_created(apps, schema_editor):
+    # pending bookings from before holds expired never got a deadline, so the
+    # sweeper skipped them; give them the one they would have had
+    apps.get_model("api", "Booking").objects.filter(status="pending", hold_expires_at__isnull=True).update(
+        hold_expires_at=F("created_at") + settings.BOOKING_HOLD_TTL
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_webhook_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(hold_from_created, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import JSONField
 from django.core.validators import FileExtensionValidator
+from datetime import timedelta
 import uuid
 
 
@@ -35,6 +40,7 @@ class VehicleCategory(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=50)  # SUV, Safari Jeep, Luxury Van
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Vehicle(models.Model):
@@ -53,13 +59,51 @@ class Vehicle(models.Model):
     )
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # maintained from reviews by api.ratings
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    # name, category and description; maintained by api.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["average_rating", "id"], name="vehicle_rating_idx"),
+            GinIndex(fields=["search_vector"], name="vehicle_search_idx"),
+        ]
 
-class VehicleAvailability(models.Model):
+
+class VehicleReservation(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name="availabilities")
-    date = models.DateField()
-    is_booked = models.BooleanField(default=False)
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name="reservations")
+    # null booking = manual block (maintenance, owner use, ...)
+    booking = models.OneToOneField(
+        "Booking", on_delete=models.CASCADE, blank=True, null=True, related_name="reservation"
+    )
+    period = DateRangeField()  # half-open: [start_date, end_date + 1 day)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Postgres guarantees no two active reservations of a vehicle overlap
+            ExclusionConstraint(
+                name="vehicle_reservation_no_overlap",
+                expressions=[
+                    ("vehicle", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+    @property
+    def start_date(self):
+        return self.period.lower
+
+    @property
+    def end_date(self):
+        return self.period.upper - timedelta(days=1)
 
 
 # -------------------------------
@@ -72,14 +116,40 @@ class SafariPackage(models.Model):
     region = models.CharField(max_length=100)  # e.g., Bwindi, Murchison Falls
     duration_days = models.IntegerField()
     base_price = models.DecimalField(max_digits=10, decimal_places=2)
-    seats_available = models.IntegerField()
+    seats_available = models.IntegerField()  # capacity of each departure
     image = models.ImageField(
         upload_to="safaris/",
         blank=True,
         null=True,
         validators=[FileExtensionValidator(allowed_extensions=["jpg", "jpeg", "png"])]
     )
+    is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # maintained from reviews by api.ratings
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    # name, region and description; maintained by api.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["average_rating", "id"], name="safari_rating_idx"),
+            GinIndex(fields=["search_vector"], name="safari_search_idx"),
+        ]
+
+
+class SafariDeparture(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    safari = models.ForeignKey(SafariPackage, on_delete=models.CASCADE, related_name="departures")
+    departure_date = models.DateField()
+    seats_available = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["safari", "departure_date"], name="unique_safari_departure"),
+            models.CheckConstraint(check=models.Q(seats_available__gte=0), name="safari_departure_seats_non_negative"),
+        ]
 
 
 class SafariItinerary(models.Model):
@@ -88,6 +158,7 @@ class SafariItinerary(models.Model):
     day_number = models.IntegerField()
     title = models.CharField(max_length=150)
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 # -------------------------------
@@ -113,12 +184,24 @@ class Booking(models.Model):
             ("confirmed", "Confirmed"),
             ("cancelled", "Cancelled"),
             ("completed", "Completed"),
+            ("expired", "Expired"),
         ],
         default="pending",
     )
-    idempotency_key = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    hold_expires_at = models.DateTimeField(blank=True, null=True)  # pending inventory is released after this
+    idempotency_key = models.CharField(max_length=255, blank=True, null=True)
     details = models.JSONField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "idempotency_key"], name="unique_booking_idempotency_key"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="booking_user_created_idx"),
+            models.Index(fields=["hold_expires_at"], condition=models.Q(status="pending"), name="booking_pending_hold_idx"),
+        ]
 
 # -------------------------------
 # 5. Payments & Invoices
@@ -150,6 +233,43 @@ class Invoice(models.Model):
     issued_at = models.DateTimeField(auto_now_add=True)
 
 
+class WebhookEvent(models.Model):
+    """
+    A payment provider notification as received. The payload is never
+    changed after insert; only the processing fields are.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=50)
+    # identifies a notification across provider retries
+    dedupe_key = models.CharField(max_length=200)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ("pending", "Pending"),
+            ("processed", "Processed"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.TextField(blank=True, default="")  # outcome, or the error of a failed attempt
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "dedupe_key"], name="webhook_event_dedupe"),
+        ]
+        indexes = [
+            # only the small unprocessed tail: the consumer's queue and the lag/failed stats
+            models.Index(
+                fields=["status", "received_at"], condition=~models.Q(status="processed"),
+                name="webhook_event_unprocessed_idx",
+            ),
+        ]
+
+
 # -------------------------------
 # 6. Reviews & Ratings
 # -------------------------------
@@ -162,6 +282,12 @@ class Review(models.Model):
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["safari", "-created_at"], condition=models.Q(safari__isnull=False), name="review_safari_created_idx"),
+            models.Index(fields=["vehicle", "-created_at"], condition=models.Q(vehicle__isnull=False), name="review_vehicle_created_idx"),
+        ]
+
 
 # -------------------------------
 # 7. Notifications & Messages
@@ -173,6 +299,33 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "is_read", "-created_at"], name="notification_inbox_idx"),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """A rendered email waiting for batched delivery; delivered rows are deleted."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    to = models.JSONField()  # list of recipient addresses
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=[("pending", "Pending"), ("failed", "Failed")],
+        default="pending",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    claimed_until = models.DateTimeField(blank=True, null=True)  # lease held by a drain that is sending it
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], condition=models.Q(status="pending"), name="outgoing_email_pending_idx"),
+        ]
+
 
 # -------------------------------
 # 8. Admin Logs (Audit Trail)
@@ -183,3 +336,19 @@ class AdminLog(models.Model):
     action = models.CharField(max_length=200)
     details = models.JSONField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+# -------------------------------
+# 9. Pricing
+# -------------------------------
+class SeasonalRate(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100)  # e.g., Peak season, Gorilla low season
+    applies_to = models.CharField(
+        max_length=20,
+        choices=[("all", "All"), ("vehicle", "Vehicles"), ("safari", "Safaris")],
+        default="all",
+    )
+    start_date = models.DateField()
+    end_date = models.DateField()
+    multiplier = models.DecimalField(max_digits=4, decimal_places=2)  # 1.25 = +25%
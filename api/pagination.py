@@ -0,0 +1,165 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of the last row already seen, e.g.
+``(created_at, id)``, instead of an OFFSET. Page 1000 costs the same as page
+1, and rows inserted meanwhile never shift results between pages. The key
+is the queryset's ordering (including whatever ``?ordering=`` selected)
+with the primary key appended as a tie-breaker.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """Row estimate from the Postgres planner instead of a full COUNT(*)."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return int(cursor.fetchone()[0][0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+    def get_ordering(self, queryset):
+        ordering = [str(field) for field in queryset.query.order_by if isinstance(field, str)] or ["pk"]
+        if not any(field.lstrip("-") in ("pk", "id") for field in ordering):
+            ordering.append("-pk" if ordering[-1].startswith("-") else "pk")
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return list(cursor["v"]), bool(cursor.get("r"))
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse=False):
+        cursor = json.dumps({"v": values, "r": int(reverse)}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def key_values(self, row, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            if isinstance(row, dict):  # .values() rows
+                value = row["id" if name == "pk" else name]
+            elif name == "pk":
+                value = row.pk
+            else:
+                try:
+                    value = getattr(row, row._meta.get_field(name).attname)
+                except FieldDoesNotExist:
+                    value = getattr(row, name)  # annotation, e.g. a search rank
+            values.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        return values
+
+    @staticmethod
+    def after(ordering, values):
+        """Rows strictly after ``values`` in ``ordering``: (a > x) OR (a = x AND b > y) ..."""
+        position = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip("-")
+            clause = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": values[i]})
+            for prev_field, prev_value in zip(ordering[:i], values[:i]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            position |= clause
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == "estimate":
+            self.count = estimate_count(queryset)
+        elif count_mode == "exact":
+            self.count = queryset.count()
+
+        self.ordering = self.get_ordering(queryset)
+        values, reverse = self.decode_cursor(request)
+        if values is not None and len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.after(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # walking backwards, "more" rows lie before the page and the cursor row after it
+        more_after = values is not None if reverse else has_more
+        more_before = has_more if reverse else values is not None
+        self.next_url = self.previous_url = None
+        if rows and more_after:
+            self.next_url = self.encode_cursor(self.key_values(rows[-1], self.ordering))
+        if rows and more_before:
+            self.previous_url = self.encode_cursor(self.key_values(rows[0], self.ordering), reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        response = {"next": self.next_url, "previous": self.previous_url, "results": data}
+        if self.count is not None:
+            response = {"count": self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "description": f"Only with ?{self.count_query_param}=exact|estimate"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {"name": self.cursor_query_param, "required": False, "in": "query",
+             "description": "Opaque cursor from a previous page's next/previous link.", "schema": {"type": "string"}},
+            {"name": self.page_size_query_param, "required": False, "in": "query",
+             "description": f"Results per page (max {settings.API_MAX_PAGE_SIZE}).", "schema": {"type": "integer"}},
+            {"name": self.count_query_param, "required": False, "in": "query",
+             "description": "Include a total: 'exact' runs COUNT(*), 'estimate' uses the planner's row estimate.",
+             "schema": {"type": "string", "enum": ["exact", "estimate"]}},
+        ]
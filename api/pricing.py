@@ -0,0 +1,105 @@
+"""
+Server-side booking quotes.
+
+The rate table (base rate of every vehicle and safari plus per-day seasonal
+multipliers) is built once per pricing version and kept in process memory
+and in Redis. Pricing an item is then dictionary lookups and arithmetic,
+with no ORM access per item; a vehicle hire of any length costs one
+prefix-sum subtraction.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from .cache import get_version
+from .models import SafariPackage, SeasonalRate, Vehicle
+
+CURRENCY = "UGX"
+RATE_TABLE_TIMEOUT = 60 * 60
+CENTS = Decimal("0.01")
+ONE = Decimal("1")
+
+_local = {"version": None, "table": None}
+
+
+class QuoteError(Exception):
+    pass
+
+
+def _season_table(seasons):
+    """Prefix sums of the daily multiplier over the span covered by ``seasons``."""
+    if not seasons:
+        return {"first": None, "prefix": [Decimal(0)]}
+    first = min(season.start_date for season in seasons)
+    last = max(season.end_date for season in seasons)
+    daily = [None] * ((last - first).days + 1)
+    for season in seasons:
+        for offset in range((season.start_date - first).days, (season.end_date - first).days + 1):
+            # overlapping seasons: the highest multiplier wins
+            daily[offset] = season.multiplier if daily[offset] is None else max(daily[offset], season.multiplier)
+    prefix = [Decimal(0)]
+    for multiplier in daily:
+        prefix.append(prefix[-1] + (ONE if multiplier is None else multiplier))
+    return {"first": first, "prefix": prefix}
+
+
+def build_rate_table():
+    seasons = list(SeasonalRate.objects.all())
+    return {
+        "vehicle": {str(pk): rate for pk, rate in Vehicle.objects.values_list("pk", "daily_rate")},
+        "safari": {str(pk): price for pk, price in SafariPackage.objects.values_list("pk", "base_price")},
+        "seasons": {
+            kind: _season_table([s for s in seasons if s.applies_to in ("all", kind)])
+            for kind in ("vehicle", "safari")
+        },
+    }
+
+
+def get_rate_table():
+    version = get_version("pricing")
+    if version is None:  # cache unavailable: nothing to key on, build fresh
+        return build_rate_table()
+    if _local["version"] == version:
+        return _local["table"]
+    key = f"pricing:rate_table:{version}"
+    table = cache.get(key)
+    if table is None:
+        table = build_rate_table()
+        cache.set(key, table, RATE_TABLE_TIMEOUT)
+    _local.update(version=version, table=table)
+    return table
+
+
+def multiplier_sum(table, kind, start, end):
+    """Sum of daily multipliers for ``start``..``end`` inclusive."""
+    season = table["seasons"][kind]
+    days = (end - start).days + 1
+    if season["first"] is None:
+        return Decimal(days)
+    prefix = season["prefix"]
+    span = len(prefix) - 1
+    lo = min(max((start - season["first"]).days, 0), span)
+    hi = min(max((end - season["first"]).days + 1, 0), span)
+    # days outside every season count at 1x
+    return prefix[hi] - prefix[lo] + (days - (hi - lo))
+
+
+def vehicle_price(table, daily_rate, start, end=None):
+    return (daily_rate * multiplier_sum(table, "vehicle", start, end or start)).quantize(CENTS)
+
+
+def safari_price(table, base_price, departure_date, pax):
+    return (base_price * pax * multiplier_sum(table, "safari", departure_date, departure_date)).quantize(CENTS)
+
+
+def quote_item(table, item):
+    """Price one validated quote item (see QuoteRequestSerializer)."""
+    if item["booking_type"] == "vehicle":
+        rate = table["vehicle"].get(str(item["vehicle"]))
+        if rate is None:
+            raise QuoteError("Unknown vehicle.")
+        return vehicle_price(table, rate, item["start_date"], item.get("end_date"))
+    price = table["safari"].get(str(item["safari"]))
+    if price is None:
+        raise QuoteError("Unknown safari.")
+    return safari_price(table, price, item["start_date"], item.get("pax", 1))
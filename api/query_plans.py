@@ -0,0 +1,112 @@
+"""
+Registry of hot queries and the index each one is expected to use.
+
+``api/tests/test_query_plans.py`` EXPLAINs every entry against a seeded,
+ANALYZEd database and fails when the planner no longer picks the intended
+index, so a model or query change cannot quietly turn one of these into a
+sequential scan.
+"""
+import uuid
+from datetime import date, timedelta
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .filters import VehicleFilter
+from .models import (
+    Booking, Notification, OutgoingEmail, Payment, Review, SafariPackage, Vehicle, WebhookEvent,
+)
+from .search import search_query
+
+HOT_QUERIES = {}
+
+
+def _index_names(plan):
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+def plan_indexes(queryset):
+    """Names of the indexes the planner would use for ``queryset``, sorted."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return sorted(set(_index_names(plan[0]["Plan"])))
+
+
+def hot_query(name, index):
+    """
+    Register a queryset builder. ``index`` is an index name prefix, or a
+    tuple of prefixes when more than one index is an acceptable plan.
+    """
+    def register(build):
+        HOT_QUERIES[name] = (build, index)
+        return build
+    return register
+
+
+@hot_query("bookings_by_user", index="booking_user_created_idx")
+def bookings_by_user():
+    return Booking.objects.filter(user_id=uuid.uuid4()).order_by("-created_at")[:50]
+
+
+@hot_query("expired_holds", index="booking_pending_hold_idx")
+def expired_holds():
+    return Booking.objects.filter(status="pending", hold_expires_at__lt=timezone.now()).order_by("hold_expires_at")[:500]
+
+
+@hot_query("payment_by_transaction_ref", index="api_payment_transaction_ref")
+def payment_by_transaction_ref():
+    return Payment.objects.filter(transaction_ref=str(uuid.uuid4()))
+
+
+# the vehicle list's available_from/available_to filter: its ~Exists must be
+# answered by the (vehicle, period) GiST index behind the exclusion constraint
+@hot_query("vehicle_reservation_overlap", index="vehicle_reservation_no_overlap")
+def vehicle_reservation_overlap():
+    start = date.today()
+    return VehicleFilter({
+        "available_from": start.isoformat(),
+        "available_to": (start + timedelta(days=7)).isoformat(),
+    }).qs
+
+
+@hot_query("unread_notifications", index="notification_inbox_idx")
+def unread_notifications():
+    return Notification.objects.filter(user_id=uuid.uuid4(), is_read=False).order_by("-created_at")[:50]
+
+
+@hot_query("reviews_by_safari", index="review_safari_created_idx")
+def reviews_by_safari():
+    return Review.objects.filter(safari_id=uuid.uuid4()).order_by("-created_at")[:50]
+
+
+@hot_query("reviews_by_vehicle", index="review_vehicle_created_idx")
+def reviews_by_vehicle():
+    return Review.objects.filter(vehicle_id=uuid.uuid4()).order_by("-created_at")[:50]
+
+
+@hot_query("vehicle_search", index="vehicle_search_idx")
+def vehicle_search():
+    return Vehicle.objects.filter(search_vector=search_query("land cruis"))
+
+
+@hot_query("safari_search", index="safari_search_idx")
+def safari_search():
+    return SafariPackage.objects.filter(search_vector=search_query("gorilla trek"))
+
+
+@hot_query("pending_emails", index="outgoing_email_pending_idx")
+def pending_emails():
+    return OutgoingEmail.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=timezone.now()), status="pending"
+    ).order_by("created_at")[:50]
+
+
+@hot_query("pending_webhook_events", index="webhook_event_unprocessed_idx")
+def pending_webhook_events():
+    return WebhookEvent.objects.filter(status="pending").order_by("received_at")[:100]
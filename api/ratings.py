@@ -0,0 +1,75 @@
+"""
+Denormalized review aggregates.
+
+``average_rating`` and ``review_count`` on Vehicle and SafariPackage are
+stored, so listing or sorting the catalog by rating never touches the
+Review table. A review write recomputes only the vehicle or safari it
+belongs to (an index range scan over that target's reviews), holding the
+target's row lock so concurrent reviews are counted in turn; the nightly
+reconcile_ratings task repairs anything a bulk write bypassed.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .cache import bump_version_on_commit, model_scope
+from .models import Vehicle, SafariPackage, Review
+
+RATED_MODELS = {Vehicle: "vehicle", SafariPackage: "safari"}
+
+
+def _aggregates(model):
+    """Correlated subqueries for the actual ``(review_count, average_rating)`` of each row."""
+    reviews = Review.objects.filter(**{RATED_MODELS[model]: OuterRef("pk")}).order_by().values(RATED_MODELS[model])
+    count = Subquery(reviews.annotate(n=Count("pk")).values("n"))
+    average = Subquery(reviews.annotate(
+        average=Cast(Avg("rating"), DecimalField(max_digits=3, decimal_places=2))
+    ).values("average"))
+    return Coalesce(count, 0), Coalesce(average, Value(Decimal("0.00")), output_field=DecimalField())
+
+
+def refresh_ratings(model, pks):
+    """
+    Recompute the stored aggregates of ``model`` rows ``pks`` in one UPDATE.
+
+    The rows are locked first, in pk order: under READ COMMITTED an UPDATE
+    that waits on another writer keeps the review snapshot it started with,
+    so two concurrent reviews of the same target could each store a count
+    missing the other. Taking the lock in its own statement gives the UPDATE
+    a snapshot that includes every review committed before it.
+    """
+    count, average = _aggregates(model)
+    with transaction.atomic():
+        list(model.objects.select_for_update().filter(pk__in=pks).order_by("pk").values_list("pk", flat=True))
+        updated = model.objects.filter(pk__in=pks).update(
+            review_count=count, average_rating=average, updated_at=timezone.now()
+        )
+    if updated:
+        # queryset updates skip post_save
+        bump_version_on_commit(model_scope(model))
+    return updated
+
+
+def refresh_review_targets(review, previous=None):
+    """Refresh whatever ``review`` rates now, and what it rated before an edit."""
+    targets = {(Vehicle, review.vehicle_id), (SafariPackage, review.safari_id)}
+    if previous:
+        targets |= {(Vehicle, previous[1]), (SafariPackage, previous[0])}
+    for model in RATED_MODELS:
+        pks = [pk for target_model, pk in targets if target_model is model and pk]
+        if pks:
+            refresh_ratings(model, pks)
+
+
+def reconcile(model):
+    """Fix rows whose stored aggregates drifted from the Review table; returns how many."""
+    count, average = _aggregates(model)
+    drifted = (
+        model.objects.annotate(actual_count=count, actual_average=average)
+        .filter(~Q(review_count=F("actual_count")) | ~Q(average_rating=F("actual_average")))
+        .values_list("pk", flat=True)
+    )
+    return refresh_ratings(model, list(drifted))
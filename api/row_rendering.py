@@ -0,0 +1,95 @@
+"""
+Read-only list rendering from ``.values()`` rows.
+
+Rendering a page through a ModelSerializer builds a model instance per row
+and walks every field's ``get_attribute``. For flat serializers (plain
+columns and related primary keys) the same output can be produced from
+``.values()`` rows by calling each bound field's ``to_representation``
+directly, which is where most of the time went. The serializer's own
+fields do the formatting, so ``?fields=`` and every field option keep
+working and the output stays identical; anything that needs an instance
+(nested or method fields) falls back to the normal path.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def _identity(value):
+    return value
+
+
+def _datetime_converter(field):
+    """DateTimeField.to_representation with the current-timezone lookup hoisted out of the row loop."""
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+
+    def convert(value):
+        if field_timezone is None or not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    return convert
+
+
+def compile_row_renderer(serializer):
+    """
+    ``(columns, render)`` where ``render(row)`` turns a ``.values(*columns)``
+    row into ``serializer``'s representation, or None if a field needs a
+    model instance.
+    """
+    opts = serializer.Meta.model._meta
+    plan = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if isinstance(field, PrimaryKeyRelatedField) and model_field.many_to_one and field.pk_field is None:
+            convert = _identity  # the serializer emits the raw pk
+        elif isinstance(field, RelatedField) or model_field.is_relation:
+            return None
+        elif isinstance(model_field, models.FileField):
+            def convert(name, field=field, model_field=model_field):
+                return field.to_representation(model_field.attr_class(None, model_field, name))
+        elif isinstance(field, serializers.DateTimeField):
+            convert = _datetime_converter(field)
+        else:
+            convert = field.to_representation
+        plan.append((field.field_name, model_field.attname, convert))
+
+    def render(row):
+        return {
+            name: None if row[column] is None else convert(row[column])
+            for name, column, convert in plan
+        }
+    return [column for _, column, _ in plan], render
+
+
+class ValuesListMixin:
+    """Viewset mixin serving ``list`` from ``.values()`` rows whenever the serializer allows it."""
+
+    def list(self, request, *args, **kwargs):
+        compiled = compile_row_renderer(self.get_serializer())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        columns, render = compiled
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # the keyset paginator reads the ordering columns (and id) from each row
+        ordering = [field.lstrip("-") for field in queryset.query.order_by if isinstance(field, str)]
+        extra = {"id", *ordering} - set(columns) - {"pk"}
+        rows = queryset.values(*columns, *sorted(extra))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([render(row) for row in page])
+        return Response([render(row) for row in rows])
@@ -0,0 +1,75 @@
+"""
+Full-text search for the vehicle and safari catalogs.
+
+Each catalog model keeps a weighted ``search_vector`` (name > category or
+region > description) behind a GIN index, refreshed from the model's
+signals. ``?search=`` turns every word into a prefix match, so partial
+words typed into a search box already hit, and results come back ordered
+by relevance. Views over models without a ``search_vector`` keep DRF's
+``icontains`` search over ``search_fields``.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+from .models import VehicleCategory, Vehicle, SafariPackage
+
+SEARCH_CONFIG = "english"
+RANK_ANNOTATION = "search_rank"
+
+
+def _vector(*weighted):
+    vector = None
+    for expression, weight in weighted:
+        part = SearchVector(expression, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def search_vector(model):
+    """The expression ``model.search_vector`` is kept equal to."""
+    if model is Vehicle:
+        category_name = Subquery(VehicleCategory.objects.filter(pk=OuterRef("category_id")).values("name")[:1])
+        return _vector(("name", "A"), (category_name, "B"), ("description", "C"))
+    if model is SafariPackage:
+        return _vector(("name", "A"), ("region", "B"), ("description", "C"))
+    raise ValueError(f"{model.__name__} has no search vector")
+
+
+def update_search_vectors(queryset):
+    """Recompute ``search_vector`` for every row of ``queryset`` in one UPDATE."""
+    return queryset.update(search_vector=search_vector(queryset.model))
+
+
+def search_query(text):
+    """Prefix-matching tsquery for ``text``, or None if it holds no words."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    # only word characters reach the raw query, so it cannot be malformed
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by ``search_vector``, ranked by relevance."""
+
+    def filter_queryset(self, request, queryset, view):
+        if not hasattr(queryset.model, "search_vector"):
+            return super().filter_queryset(request, queryset, view)
+
+        text = request.query_params.get(self.search_param, "")
+        if not text.strip():
+            return queryset
+        query = search_query(text)
+        if query is None:
+            return queryset.none()
+        # float8 so the rank survives a round trip through a pagination cursor
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(**{RANK_ANNOTATION: rank})
+            .order_by(f"-{RANK_ANNOTATION}", *queryset.query.order_by)
+        )
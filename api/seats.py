@@ -0,0 +1,39 @@
+"""
+Safari seat inventory.
+
+Seats are counted per departure date. Reserving is a single conditional
+``UPDATE ... SET seats_available = seats_available - pax WHERE
+seats_available >= pax``, so no buyer holds a lock while Python runs and
+bookings for different departures never touch the same row.
+"""
+from django.db.models import F
+
+from .models import SafariDeparture
+
+
+class SeatsUnavailable(Exception):
+    """The departure does not have enough seats left."""
+
+
+def _take(safari_id, departure_date, pax):
+    return SafariDeparture.objects.filter(
+        safari_id=safari_id, departure_date=departure_date, seats_available__gte=pax
+    ).update(seats_available=F("seats_available") - pax)
+
+
+def reserve_seats(safari, departure_date, pax):
+    if _take(safari.pk, departure_date, pax):
+        return
+    # first booking for this date opens the departure at package capacity
+    SafariDeparture.objects.bulk_create(
+        [SafariDeparture(safari=safari, departure_date=departure_date, seats_available=safari.seats_available)],
+        ignore_conflicts=True,
+    )
+    if not _take(safari.pk, departure_date, pax):
+        raise SeatsUnavailable()
+
+
+def release_seats(safari_id, departure_date, pax):
+    SafariDeparture.objects.filter(safari_id=safari_id, departure_date=departure_date).update(
+        seats_available=F("seats_available") + pax
+    )
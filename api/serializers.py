@@ -1,18 +1,36 @@
+from collections import defaultdict
 from rest_framework import serializers
-from django.db import transaction
+from utils.s3 import MAX_UPLOAD_SIZE
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from .availability import (
+    ReservationConflict, active_reservations, reservation_period, reserve_vehicle, reserve_vehicles
+)
+from .expansion import ExpandableFieldsMixin
+from .holds import hold_deadline
+from .idempotency import get_idempotency_key
+from .pricing import get_rate_table, safari_price, vehicle_price
+from .seats import SeatsUnavailable, reserve_seats
 from .models import (
-    User, VehicleCategory, Vehicle, VehicleAvailability,
-    SafariPackage, SafariItinerary,
+    User, VehicleCategory, Vehicle, VehicleReservation,
+    SafariPackage, SafariDeparture, SafariItinerary,
     Booking, Payment, Invoice,
     Review, Notification, AdminLog
 )
 
 
+IDEMPOTENCY_CONSTRAINT = "unique_booking_idempotency_key"
+
+
+def _violated_constraint(exc):
+    """Name of the constraint behind an IntegrityError, when the driver reports it."""
+    return getattr(getattr(exc.__cause__, "diag", None), "constraint_name", None)
+
+
 # -------------------------------
 # 1. User Serializer
 # -------------------------------
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "phone", "role", "is_verified", "created_at"]
@@ -22,63 +40,101 @@ class UserSerializer(serializers.ModelSerializer):
 # -------------------------------
 # 2. Vehicle Serializers
 # -------------------------------
-class VehicleCategorySerializer(serializers.ModelSerializer):
+class VehicleCategorySerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = VehicleCategory
         fields = ["id", "name", "description"]
 
 
-class VehicleAvailabilitySerializer(serializers.ModelSerializer):
+class BookedPeriodSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
-        model = VehicleAvailability
-        fields = ["id", "date", "is_booked"]
+        model = VehicleReservation
+        fields = ["id", "start_date", "end_date"]
+
+
+class VehicleReservationSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+
+    class Meta:
+        model = VehicleReservation
+        fields = ["id", "vehicle", "booking", "start_date", "end_date", "is_active", "created_at"]
+        read_only_fields = ["id", "booking", "created_at"]
+
+    def validate(self, attrs):
+        if "start_date" not in attrs and "end_date" not in attrs:
+            return attrs
+        start = attrs.pop("start_date", None) or self.instance.start_date
+        end = attrs.pop("end_date", None) or getattr(self.instance, "end_date", None) or start
+        if end < start:
+            raise serializers.ValidationError("end_date must be after start_date")
+        attrs["period"] = reservation_period(start, end)
+        return attrs
 
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError("Vehicle is already reserved for part of that period.")
 
-class VehicleSerializer(serializers.ModelSerializer):
-    category = VehicleCategorySerializer(read_only=True)
-    availabilities = VehicleAvailabilitySerializer(many=True, read_only=True)
 
+class VehicleSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Vehicle
         fields = ["id", "category", "name", "description", "seats",
                   "daily_rate", "with_driver", "image",
-                  "is_available", "created_at", "availabilities"]
-        read_only_fields = ["id", "created_at"]
+                  "is_available", "average_rating", "review_count", "created_at", "updated_at"]
+        read_only_fields = ["id", "average_rating", "review_count", "created_at", "updated_at"]
+        expandable_fields = {
+            "category": VehicleCategorySerializer,
+            "availabilities": (BookedPeriodSerializer, {
+                "source": "reservations", "many": True, "prefetch": active_reservations,
+            }),
+        }
 
 
 # -------------------------------
 # 3. Safari Serializers
 # -------------------------------
-class SafariItinerarySerializer(serializers.ModelSerializer):
+class SafariItinerarySerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SafariItinerary
         fields = ["id", "day_number", "title", "description"]
 
 
-class SafariPackageSerializer(serializers.ModelSerializer):
-    itinerary = SafariItinerarySerializer(many=True, read_only=True)
+class SafariDepartureSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = SafariDeparture
+        fields = ["departure_date", "seats_available"]
+
 
+class SafariPackageSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SafariPackage
         fields = ["id", "name", "description", "region", "duration_days",
                   "base_price", "seats_available", "image",
-                  "created_at", "itinerary"]
-        read_only_fields = ["id", "created_at"]
+                  "is_featured", "average_rating", "review_count", "created_at", "updated_at"]
+        read_only_fields = ["id", "average_rating", "review_count", "created_at", "updated_at"]
+        expandable_fields = {
+            "itinerary": (SafariItinerarySerializer, {"many": True}),
+        }
 
 
 # -------------------------------
 # 4. Booking Serializers
 # -------------------------------
-class BookingSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
-    vehicle = VehicleSerializer(read_only=True)
-    safari = SafariPackageSerializer(read_only=True)
-
+class BookingSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = ["id", "user", "booking_type", "vehicle", "safari",
-                  "start_date", "end_date", "total_price", "status", "created_at"]
-        read_only_fields = ["id", "created_at"]
+                  "start_date", "end_date", "total_price", "status", "hold_expires_at", "created_at", "updated_at"]
+        read_only_fields = ["id", "user", "vehicle", "safari", "created_at", "updated_at"]
+        expandable_fields = {
+            "user": UserSerializer,
+            "vehicle": VehicleSerializer,
+            "safari": SafariPackageSerializer,
+        }
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -89,8 +145,8 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         model = Booking
         fields = ["id", "user", "booking_type", "vehicle", "safari",
                   "start_date", "end_date", "pax", "total_price",
-                  "status", "idempotency_key", "details", "created_at"]
-        read_only_fields = ["id", "status", "created_at", "details"]
+                  "status", "hold_expires_at", "idempotency_key", "details", "created_at"]
+        read_only_fields = ["id", "total_price", "status", "hold_expires_at", "created_at", "details"]
 
     def validate(self, attrs):
         if attrs.get("booking_type") == "vehicle" and not attrs.get("vehicle"):
@@ -99,69 +155,157 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Safari booking requires a safari.")
         if attrs.get("end_date") and attrs["end_date"] < attrs["start_date"]:
             raise serializers.ValidationError("end_date must be after start_date")
+
+        # price server-side; the related object is already loaded, only seasons come from the table
+        table = get_rate_table()
+        if attrs["booking_type"] == "vehicle":
+            attrs["total_price"] = vehicle_price(table, attrs["vehicle"].daily_rate, attrs["start_date"], attrs.get("end_date"))
+        else:
+            attrs["total_price"] = safari_price(table, attrs["safari"].base_price, attrs["start_date"], attrs.get("pax", 1))
         return attrs
 
     def create(self, validated_data):
         request = self.context.get("request")
-        user = request.user if request else None
-        idempotency_key = validated_data.pop("idempotency_key", None)
+        user = validated_data.pop("user", None) or (request.user if request else None)
+        idempotency_key = validated_data.pop("idempotency_key", None) or (
+            get_idempotency_key(request) if request else None
+        )
 
         if idempotency_key:
             existing = Booking.objects.filter(user=user, idempotency_key=idempotency_key).first()
             if existing:
                 return existing
+            try:
+                return self._create_booking(user, validated_data, idempotency_key, request)
+            except IntegrityError as exc:
+                if _violated_constraint(exc) != IDEMPOTENCY_CONSTRAINT:
+                    raise
+                # a concurrent retry won the (user, idempotency_key) constraint
+                return Booking.objects.get(user=user, idempotency_key=idempotency_key)
+        return self._create_booking(user, validated_data, idempotency_key, request)
+
+    def _create_booking(self, user, validated_data, idempotency_key, request):
+        details = validated_data.pop("details", None) or {}
+        details.update({
+            "created_by_ip": request.META.get("REMOTE_ADDR") if request else None,
+            "created_at": timezone.now().isoformat()
+        })
 
         with transaction.atomic():
             btype = validated_data.get("booking_type")
             if btype == "vehicle":
-                vehicle = Vehicle.objects.select_for_update().get(pk=validated_data["vehicle"].pk)
+                vehicle = validated_data["vehicle"]
                 start = validated_data["start_date"]
-                end = validated_data.get("end_date", start)
-                conflict = VehicleAvailability.objects.filter(
-                    vehicle=vehicle, date__range=(start, end), is_booked=True
-                ).exists()
-                if conflict:
+                end = validated_data.get("end_date") or start
+                booking = Booking.objects.create(
+                    user=user, **validated_data, status="pending", hold_expires_at=hold_deadline(),
+                    idempotency_key=idempotency_key, details=details,
+                )
+                try:
+                    reserve_vehicle(vehicle, start, end, booking=booking)
+                except ReservationConflict:
                     raise serializers.ValidationError("Selected vehicle is not available for the requested date range.")
-
-                booking = Booking.objects.create(user=user, **validated_data, status="pending", idempotency_key=idempotency_key)
-                from datetime import timedelta
-                cur = start
-                while cur <= end:
-                    obj, created = VehicleAvailability.objects.get_or_create(vehicle=vehicle, date=cur, defaults={"is_booked": True})
-                    if not created and obj.is_booked:
-                        raise serializers.ValidationError("Race condition: vehicle booked concurrently.")
-                    elif not created:
-                        obj.is_booked = True
-                        obj.save()
-                    cur += timedelta(days=1)
             else:
-                safari = SafariPackage.objects.select_for_update().get(pk=validated_data["safari"].pk)
-                pax = validated_data.get("pax", 1)
-                if safari.seats_available is not None and safari.seats_available < pax:
+                try:
+                    reserve_seats(validated_data["safari"], validated_data["start_date"], validated_data.get("pax", 1))
+                except SeatsUnavailable:
                     raise serializers.ValidationError("Not enough seats available for this safari")
-                safari.seats_available -= pax
-                safari.save()
-                booking = Booking.objects.create(user=user, **validated_data, status="pending", idempotency_key=idempotency_key)
-
-            booking.details = booking.details or {}
-            booking.details.update({
-                "created_by_ip": request.META.get("REMOTE_ADDR") if request else None,
-                "created_at": timezone.now().isoformat()
-            })
-            booking.save()
+                booking = Booking.objects.create(
+                    user=user, **validated_data, status="pending", hold_expires_at=hold_deadline(),
+                    idempotency_key=idempotency_key, details=details,
+                )
             return booking
 
 
+class BookingBatchCreateSerializer(serializers.Serializer):
+    """Book several vehicles and/or safaris for one group in a single transaction."""
+    MAX_ITEMS = 20
+
+    items = BookingCreateSerializer(many=True, min_length=1, max_length=MAX_ITEMS)
+
+    def create(self, validated_data):
+        request = self.context.get("request")
+        user = validated_data.pop("user", None) or (request.user if request else None)
+        details = {
+            "created_by_ip": request.META.get("REMOTE_ADDR") if request else None,
+            "created_at": timezone.now().isoformat(),
+        }
+
+        bookings = []
+        for item in validated_data["items"]:
+            item.pop("idempotency_key", None)
+            item_details = {**(item.pop("details", None) or {}), **details}
+            bookings.append(Booking(
+                user=user, status="pending", hold_expires_at=hold_deadline(), details=item_details, **item
+            ))
+
+        with transaction.atomic():
+            # one decrement per departure, always in the same order
+            pax_by_departure = defaultdict(int)
+            safaris = {}
+            for booking in bookings:
+                if booking.booking_type == "safari":
+                    pax_by_departure[(str(booking.safari_id), booking.start_date)] += booking.pax
+                    safaris[str(booking.safari_id)] = booking.safari
+            for (safari_id, departure_date), pax in sorted(pax_by_departure.items()):
+                try:
+                    reserve_seats(safaris[safari_id], departure_date, pax)
+                except SeatsUnavailable:
+                    raise serializers.ValidationError(f"Not enough seats available for {safaris[safari_id].name}")
+
+            Booking.objects.bulk_create(bookings)
+
+            try:
+                reserve_vehicles([
+                    (booking.vehicle_id, booking.start_date, booking.end_date or booking.start_date, booking)
+                    for booking in bookings if booking.booking_type == "vehicle"
+                ])
+            except ReservationConflict:
+                raise serializers.ValidationError("One or more vehicles are not available for the requested date ranges.")
+        return bookings
+
+    def to_representation(self, instance):
+        return {"bookings": BookingCreateSerializer(instance, many=True, context=self.context).data}
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    # plain ids: items are priced from the rate table, not fetched one by one
+    booking_type = serializers.ChoiceField(choices=["vehicle", "safari"])
+    vehicle = serializers.UUIDField(required=False)
+    safari = serializers.UUIDField(required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+    pax = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, attrs):
+        if attrs["booking_type"] == "vehicle" and not attrs.get("vehicle"):
+            raise serializers.ValidationError("Vehicle quote requires a vehicle.")
+        if attrs["booking_type"] == "safari" and not attrs.get("safari"):
+            raise serializers.ValidationError("Safari quote requires a safari.")
+        if attrs.get("end_date") and attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError("end_date must be after start_date")
+        return attrs
+
+
+class QuoteBatchSerializer(serializers.Serializer):
+    MAX_ITEMS = 500
+
+    items = QuoteRequestSerializer(many=True, min_length=1, max_length=MAX_ITEMS)
+
+
 # -------------------------------
 # 5. Payments & Invoice
 # -------------------------------
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     idempotency_key = serializers.CharField(required=False, allow_blank=True)
 
     class Meta:
         model = Payment
         fields = "__all__"
         read_only_fields = ["status", "created_at"]
+        expandable_fields = {
+            "booking": BookingSerializer,
+        }
 
     def validate_provider(self, value):
         allowed = ["pesapal"]
@@ -170,36 +314,69 @@ class PaymentSerializer(serializers.ModelSerializer):
         return value
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Invoice
         fields = "__all__"
         read_only_fields = ["issued_at"]
+        expandable_fields = {
+            "payment": PaymentSerializer,
+        }
 
 
 # -------------------------------
 # 6. Reviews, Notifications, Admin Logs
 # -------------------------------
-class ReviewSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
-
+class ReviewSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ["id", "user", "safari", "vehicle", "rating", "comment", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "user", "created_at"]
+        expandable_fields = {
+            "user": UserSerializer,
+            "safari": SafariPackageSerializer,
+            "vehicle": VehicleSerializer,
+        }
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ["id", "user", "message", "is_read", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "user", "created_at"]
+        expandable_fields = {
+            "user": UserSerializer,
+        }
+
 
+class NotificationMarkReadSerializer(serializers.Serializer):
+    MAX_IDS = 500
 
-class AdminLogSerializer(serializers.ModelSerializer):
-    admin = UserSerializer(read_only=True)
+    # omitted = everything in the inbox
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=MAX_IDS)
 
+
+class AdminLogSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AdminLog
         fields = ["id", "admin", "action", "details", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "admin", "created_at"]
+        expandable_fields = {
+            "admin": UserSerializer,
+        }
+
+
+# -------------------------------
+# 7. Uploads
+# -------------------------------
+class PresignedUploadSerializer(serializers.Serializer):
+    file_name = serializers.CharField(max_length=200)
+    file_type = serializers.CharField(max_length=100)
+    # checked here so an oversized file fails now, not after the upload
+    size = serializers.IntegerField(min_value=1, max_value=MAX_UPLOAD_SIZE)
+
+
+class PresignedUploadBatchSerializer(serializers.Serializer):
+    MAX_FILES = 50
+
+    files = PresignedUploadSerializer(many=True, min_length=1, max_length=MAX_FILES)
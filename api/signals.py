@@ -0,0 +1,101 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_version_on_commit, model_scope
+from .notifications import adjust_unread_count, reset_unread_count
+from .ratings import refresh_review_targets
+from .search import update_search_vectors
+from .models import (
+    VehicleCategory, Vehicle, VehicleReservation, SafariPackage, SafariItinerary, SeasonalRate, Review, Notification
+)
+
+
+# -------------------------------
+# 1. Availability
+# -------------------------------
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=VehicleReservation)
+def bump_availability_version(sender, **kwargs):
+    bump_version_on_commit("availability")
+
+
+# -------------------------------
+# 2. Pricing
+# -------------------------------
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=SafariPackage)
+@receiver([post_save, post_delete], sender=SeasonalRate)
+def bump_pricing_version(sender, **kwargs):
+    bump_version_on_commit("pricing")
+
+
+# -------------------------------
+# 3. Catalog
+# -------------------------------
+# models with a per-model version counter (cache.model_scope)
+CATALOG_MODELS = (VehicleCategory, Vehicle, VehicleReservation, SafariPackage, SafariItinerary)
+
+
+def bump_catalog_version(sender, **kwargs):
+    bump_version_on_commit(model_scope(sender))
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version, sender=model)
+    post_delete.connect(bump_catalog_version, sender=model)
+
+
+# -------------------------------
+# 4. Search
+# -------------------------------
+SEARCHED_FIELDS = {
+    Vehicle: {"name", "category", "description"},
+    SafariPackage: {"name", "region", "description"},
+}
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=SafariPackage)
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCHED_FIELDS[sender] & set(update_fields):
+        return
+    update_search_vectors(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=VehicleCategory)
+def refresh_category_search_vectors(sender, instance, created, **kwargs):
+    if not created:
+        update_search_vectors(Vehicle.objects.filter(category=instance))
+
+
+# -------------------------------
+# 5. Ratings
+# -------------------------------
+@receiver(pre_save, sender=Review)
+def remember_review_targets(sender, instance, **kwargs):
+    # an edit may move the review to another vehicle/safari; both need refreshing
+    instance._previous_targets = None if instance._state.adding else (
+        Review.objects.filter(pk=instance.pk).values_list("safari_id", "vehicle_id").first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_review_ratings(sender, instance, **kwargs):
+    refresh_review_targets(instance, getattr(instance, "_previous_targets", None))
+
+
+# -------------------------------
+# 6. Notifications
+# -------------------------------
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created:
+        adjust_unread_count(instance.user_id, 0 if instance.is_read else 1)
+    else:
+        reset_unread_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_count(instance.user_id, -1)
@@ -1,17 +1,21 @@
+import logging
+import time
+
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import get_connection
 from django.conf import settings
-from django.core.cache import cache
-from django.template.loader import render_to_string
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-import boto3
-from django.db import models
-from django.db.models import Count, Prefetch
+from django.db import models, transaction
+from django.utils import timezone
+
+from .catalog import featured_safaris_json, popular_vehicles_json
+from .emails import claim_batch, queue_email, send_batch
+from .holds import expire_bookings
+from .invoices import publish_invoices, record_invoices
+from .ratings import RATED_MODELS, reconcile
+from .webhooks import inbox_stats, process_events
+from .models import Payment, Booking, WebhookEvent
 
-from .models import Payment, Booking, Invoice, Vehicle, VehicleAvailability, SafariPackage
-from .serializers import VehicleSerializer, SafariPackageSerializer
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------
@@ -25,9 +29,22 @@ def send_booking_email(self, booking_id):
     except Booking.DoesNotExist:
         return
 
-    subject = f"Booking Confirmation – {booking.id}"
-    body = f"Hello {booking.user.username},\n\nYour booking is confirmed."
-    send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [booking.user.email])
+    queue_email("booking_confirmation", {"booking": booking}, [booking.user.email])
+
+
+@shared_task(bind=True, max_retries=3)
+def send_group_booking_email(self, booking_ids):
+    """Send one confirmation email covering every booking of a group."""
+    bookings = list(
+        Booking.objects.filter(pk__in=booking_ids)
+        .select_related("user", "vehicle", "safari")
+        .order_by("start_date")
+    )
+    if not bookings:
+        return
+
+    user = bookings[0].user
+    queue_email("group_booking_confirmation", {"user": user, "bookings": bookings}, [user.email])
 
 
 # -------------------------------
@@ -41,39 +58,25 @@ def generate_invoice_and_email(self, payment_id):
     except Payment.DoesNotExist:
         return
 
-    # Generate PDF invoice
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer)
-    styles = getSampleStyleSheet()
-    doc.build([
-        Paragraph(f"Invoice for booking {payment.booking.id}", styles['Normal']),
-        Paragraph(f"Amount: {payment.amount} {payment.currency}", styles['Normal'])
-    ])
-    pdf_bytes = buffer.getvalue()
-
-    # Upload to S3
-    s3 = boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME,
-    )
-    key = f"invoices/{payment.transaction_ref}.pdf"
-    s3.put_object(
-        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
-        Key=key,
-        Body=pdf_bytes,
-        ContentType="application/pdf",
-    )
-    pdf_url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{key}"
-
-    # Save Invoice model
-    Invoice.objects.update_or_create(payment=payment, defaults={"pdf_url": pdf_url})
+    pdf_url = publish_invoices([payment])[payment.pk]
+    record_invoices({payment.pk: pdf_url})
 
     # Email receipt
-    subject = f"Payment Receipt – {payment.transaction_ref}"
-    body = f"Thank you for your payment of {payment.amount} {payment.currency}.\nInvoice: {pdf_url}"
-    send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [payment.booking.user.email])
+    queue_email("payment_receipt", {"payment": payment, "pdf_url": pdf_url}, [payment.booking.user.email])
+
+
+@shared_task(bind=True)
+def regenerate_invoices(self, payment_ids):
+    """Rebuild the invoice PDFs of a chunk of payments without emailing anyone, reporting progress."""
+    payments = list(Payment.objects.filter(pk__in=payment_ids).order_by("created_at"))
+
+    def report(done, total):
+        if done % 25 == 0 or done == total:
+            self.update_state(state="PROGRESS", meta={"done": done, "total": total})
+
+    urls = publish_invoices(payments, on_progress=report)
+    record_invoices(urls)
+    return {"regenerated": len(urls)}
 
 
 # -------------------------------
@@ -82,32 +85,131 @@ def generate_invoice_and_email(self, payment_id):
 @shared_task
 def warm_featured_cache():
     """
-    Pre-warm Redis cache for featured safaris and popular vehicles.
-    This avoids slow queries on homepage / search endpoints.
+    Render featured safaris and popular vehicles into the catalog cache
+    ahead of the first homepage request.
     """
-    # Featured Safari Packages
-    safaris = SafariPackage.objects.filter(featured=True)\
-        .prefetch_related("itinerary")[:10]
-    safari_data = SafariPackageSerializer(safaris, many=True).data
-    cache.set("featured_safaris_v1", safari_data, 3600)  # 1 hour
-
-    # Popular Vehicles (by number of bookings)
-    vehicles = (
-        Vehicle.objects
-        .annotate(bookings_count=Count("booking"))
-        .order_by("-bookings_count")
-        .select_related("category")
-        .prefetch_related(
-            Prefetch(
-                "availabilities",
-                queryset=VehicleAvailability.objects.all().only("date", "is_booked")
-            )
-        )[:10]
-    )
-    vehicle_data = VehicleSerializer(vehicles, many=True).data
-    cache.set("popular_vehicles_v1", vehicle_data, 1800)  # 30 minutes
-
     return {
-        "featured_safaris_cached": len(safari_data),
-        "popular_vehicles_cached": len(vehicle_data),
+        "featured_safaris_bytes": len(featured_safaris_json()),
+        "popular_vehicles_bytes": len(popular_vehicles_json()),
     }
+
+
+# -------------------------------
+# 4. Booking Hold Sweeper
+# -------------------------------
+HOLD_SWEEP_BATCH_SIZE = 500
+
+
+@shared_task
+def release_expired_holds(batch_size=HOLD_SWEEP_BATCH_SIZE):
+    """
+    Expire pending bookings whose hold has run out and give back their
+    vehicle days and safari seats, a batch at a time.
+    """
+    started = time.monotonic()
+    released = batches = 0
+    while True:
+        with transaction.atomic():
+            booking_ids = list(
+                Booking.objects.select_for_update(skip_locked=True)
+                .filter(status="pending", hold_expires_at__lt=timezone.now())
+                .order_by("hold_expires_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not booking_ids:
+                break
+            released += expire_bookings(booking_ids)
+        batches += 1
+
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    logger.info("release_expired_holds: released %d holds in %d batches (%.1f ms)", released, batches, duration_ms)
+    return {"released": released, "batches": batches, "duration_ms": duration_ms}
+
+
+# -------------------------------
+# 5. Rating Reconciliation
+# -------------------------------
+@shared_task
+def reconcile_ratings():
+    """Repair stored average_rating/review_count that drifted, e.g. after bulk review imports."""
+    fixed = {model._meta.model_name: reconcile(model) for model in RATED_MODELS}
+    if any(fixed.values()):
+        logger.warning("reconcile_ratings: repaired drifted rating aggregates %s", fixed)
+    return fixed
+
+
+# -------------------------------
+# 6. Outgoing Email
+# -------------------------------
+@shared_task
+def send_queued_emails(batch_size=None):
+    """
+    Deliver pending emails a batch at a time over one connection. Rows that
+    fail or are released are skipped for the rest of the run and retried by
+    a later drain.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    started = time.monotonic()
+    sent = failed = released = batches = 0
+    skipped_pks = []
+    connection = get_connection()
+    try:
+        while True:
+            batch_started = time.monotonic()
+            outgoing = claim_batch(batch_size, exclude=skipped_pks)
+            if not outgoing:
+                break
+            connection.open()  # no-op once connected
+            batch_sent, batch_failed, batch_released = send_batch(outgoing, connection)
+            batches += 1
+            sent += batch_sent
+            failed += len(batch_failed)
+            released += len(batch_released)
+            skipped_pks += batch_failed + batch_released
+            logger.info(
+                "send_queued_emails: batch %d sent %d, failed %d, released %d (%.1f ms)",
+                batches, batch_sent, len(batch_failed), len(batch_released),
+                (time.monotonic() - batch_started) * 1000,
+            )
+            if not batch_sent:
+                # nothing got through at all: the server is likely down, so
+                # leave the rest for the next drain rather than burn attempts
+                break
+    finally:
+        connection.close()
+
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    return {"sent": sent, "failed": failed, "released": released, "batches": batches, "duration_ms": duration_ms}
+
+
+# -------------------------------
+# 7. Webhook Inbox
+# -------------------------------
+@shared_task
+def process_webhook_events(batch_size=None):
+    """Apply pending webhook events in arrival order, a batch at a time, and log the inbox lag."""
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    started = time.monotonic()
+    processed = failed = batches = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                WebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(status="pending")
+                .order_by("received_at")[:batch_size]
+            )
+            if not events:
+                break
+            batch_processed, batch_failed = process_events(events)
+        batches += 1
+        processed += batch_processed
+        failed += batch_failed
+
+    stats = inbox_stats()
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    logger.info(
+        "process_webhook_events: processed %d, failed %d in %d batches (%.1f ms); "
+        "inbox lag %.1f s, %d pending, %d failed",
+        processed, failed, batches, duration_ms, stats["lag_seconds"], stats["pending"], stats["failed"],
+    )
+    return {"processed": processed, "failed": failed, "batches": batches, "duration_ms": duration_ms, "inbox": stats}
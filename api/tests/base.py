@@ -0,0 +1,85 @@
+"""
+Shared test setup.
+
+Tests run against the real settings, so a few things are swapped out: the
+cache is local memory instead of Redis, HTTPS redirects are off, and Celery
+tasks run eagerly in the test process instead of going to the broker.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from django.db.backends.postgresql.psycopg_any import DateRange
+
+from api.models import SafariPackage, User, Vehicle, VehicleCategory, VehicleReservation
+from travel.celery import app
+
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "SECURE_SSL_REDIRECT": False,
+}
+
+
+def make_user(username, role="customer", **fields):
+    return User.objects.create(username=username, email=f"{username}@example.com", role=role, **fields)
+
+
+def make_vehicle(name="Land Cruiser", daily_rate="100.00", category=None):
+    category = category or VehicleCategory.objects.create(name="SUV")
+    return Vehicle.objects.create(category=category, name=name, seats=5, daily_rate=Decimal(daily_rate))
+
+
+def make_safari(name="Gorilla Trek", seats=8, base_price="500.00"):
+    return SafariPackage.objects.create(
+        name=name, description="Trek", region="Bwindi", duration_days=3,
+        base_price=Decimal(base_price), seats_available=seats,
+    )
+
+
+def has_constraint(name):
+    """Whether the test database actually enforces constraint ``name``."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", [name])
+        return cursor.fetchone() is not None
+
+
+def days_ahead(days):
+    return date.today() + timedelta(days=days)
+
+
+def seed_reservation_history(vehicles):
+    """Three-day reservations every 60 days per vehicle, nearly all of them in the past."""
+    VehicleReservation.objects.bulk_create(
+        VehicleReservation(vehicle=vehicle, period=DateRange(start, start + timedelta(days=3), "[)"))
+        for v, vehicle in enumerate(vehicles)
+        for start in (days_ahead(k * 60 + v % 60 - 1140) for k in range(20))
+    )
+
+
+@override_settings(**TEST_SETTINGS)
+class APITestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._celery_eager = app.conf.task_always_eager, app.conf.task_eager_propagates
+        app.conf.task_always_eager = app.conf.task_eager_propagates = True
+
+    @classmethod
+    def tearDownClass(cls):
+        app.conf.task_always_eager, app.conf.task_eager_propagates = cls._celery_eager
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = make_user("customer")
+        cls.admin = make_user("admin", role="admin")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
@@ -0,0 +1,31 @@
+from api.availability import reserve_vehicle
+
+from .base import APITestCase, days_ahead, make_vehicle
+
+URL = "/api/vehicles/availability-matrix/"
+
+
+class AvailabilityMatrixTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+
+    def test_booked_days_are_run_length_encoded(self):
+        reserve_vehicle(self.vehicle, days_ahead(2), days_ahead(3))
+        reserve_vehicle(self.vehicle, days_ahead(4), days_ahead(4))  # back to back: one run
+        reserve_vehicle(self.vehicle, days_ahead(8), days_ahead(20))  # clipped to the window
+        response = self.client.get(URL, {"from": days_ahead(0), "to": days_ahead(9)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["days"], 10)
+        self.assertEqual(response.data["vehicles"], [{"id": self.vehicle.pk, "booked": [[2, 3], [8, 2]]}])
+
+    def test_malformed_and_impossible_dates_are_400(self):
+        for params in ({"from": "2024-02-30"}, {"from": "soon"}, {"to": "2024-13-01"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(URL, params).status_code, 400)
+
+    def test_window_must_be_ordered_and_bounded(self):
+        self.assertEqual(self.client.get(URL, {"from": days_ahead(5), "to": days_ahead(1)}).status_code, 400)
+        self.assertEqual(self.client.get(URL, {"from": days_ahead(0), "to": days_ahead(400)}).status_code, 400)
@@ -0,0 +1,48 @@
+from django.test import override_settings
+
+from api.availability import reserve_vehicle
+
+from .base import APITestCase, days_ahead, make_vehicle
+
+
+class AvailabilityWindowTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.url = f"/api/vehicles/{cls.vehicle.pk}/"
+        reserve_vehicle(cls.vehicle, days_ahead(-10), days_ahead(-8))
+        reserve_vehicle(cls.vehicle, days_ahead(10), days_ahead(12))
+        reserve_vehicle(cls.vehicle, days_ahead(120), days_ahead(121))
+
+    def booked(self, **params):
+        response = self.client.get(self.url, {"expand": "availabilities", **params})
+        self.assertEqual(response.status_code, 200)
+        return [(period["start_date"], period["end_date"]) for period in response.json()["availabilities"]]
+
+    def test_defaults_to_the_next_90_days(self):
+        self.assertEqual(self.booked(), [(str(days_ahead(10)), str(days_ahead(12)))])
+
+    def test_query_parameters_widen_the_window(self):
+        booked = self.booked(availability_from=days_ahead(-30), availability_to=days_ahead(150))
+        self.assertEqual([start for start, _ in booked], [str(days_ahead(-10)), str(days_ahead(10)), str(days_ahead(120))])
+        self.assertEqual(len(self.booked(availability_to=days_ahead(120))), 2)
+
+    def test_the_list_uses_the_same_window(self):
+        response = self.client.get("/api/vehicles/", {"expand": "availabilities", "availability_to": days_ahead(150)})
+        self.assertEqual(len(response.data["results"][0]["availabilities"]), 2)
+
+    @override_settings(AVAILABILITY_WINDOW_DAYS=5)
+    def test_default_length_follows_the_setting(self):
+        self.assertEqual(self.booked(), [])
+
+    def test_oversized_and_reversed_windows_are_rejected(self):
+        params = {"expand": "availabilities"}
+        too_long = self.client.get(self.url, {**params, "availability_to": days_ahead(400)})
+        self.assertEqual(too_long.status_code, 400)
+        reversed_window = self.client.get(
+            self.url, {**params, "availability_from": days_ahead(5), "availability_to": days_ahead(1)},
+        )
+        self.assertEqual(reversed_window.status_code, 400)
+        self.assertEqual(self.client.get(self.url, {**params, "availability_from": "soon"}).status_code, 400)
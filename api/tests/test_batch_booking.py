@@ -0,0 +1,59 @@
+from api.models import Booking, OutgoingEmail, SafariDeparture, VehicleReservation
+
+from .base import APITestCase, days_ahead, make_safari, make_vehicle
+
+URL = "/api/bookings/batch/"
+
+
+class BatchBookingTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.other_vehicle = make_vehicle(name="Prado", category=cls.vehicle.category)
+        cls.safari = make_safari(seats=4)
+
+    def vehicle_item(self, vehicle, start, end):
+        return {"booking_type": "vehicle", "vehicle": str(vehicle.pk), "start_date": start, "end_date": end}
+
+    def safari_item(self, pax):
+        return {"booking_type": "safari", "safari": str(self.safari.pk), "start_date": days_ahead(10), "pax": pax}
+
+    def test_books_every_item_in_one_go(self):
+        items = [
+            self.vehicle_item(self.vehicle, days_ahead(1), days_ahead(2)),
+            self.vehicle_item(self.other_vehicle, days_ahead(1), days_ahead(2)),
+            self.safari_item(2),
+            self.safari_item(1),
+        ]
+        response = self.client.post(URL, {"items": items}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["bookings"]), 4)
+        self.assertEqual(Booking.objects.filter(user=self.customer, status="pending").count(), 4)
+        self.assertEqual(VehicleReservation.objects.filter(is_active=True).count(), 2)
+        self.assertEqual(SafariDeparture.objects.get(safari=self.safari).seats_available, 1)
+        # the whole group gets a single confirmation
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_vehicle_clash_inside_the_batch_books_nothing(self):
+        items = [
+            self.safari_item(2),
+            self.vehicle_item(self.vehicle, days_ahead(1), days_ahead(3)),
+            self.vehicle_item(self.vehicle, days_ahead(3), days_ahead(4)),
+        ]
+        response = self.client.post(URL, {"items": items}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(VehicleReservation.objects.exists())
+        self.assertFalse(SafariDeparture.objects.filter(seats_available__lt=4).exists())
+
+    def test_seats_are_checked_for_the_batch_total(self):
+        items = [self.safari_item(3), self.safari_item(2)]
+        response = self.client.post(URL, {"items": items}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_item_count_is_limited(self):
+        items = [self.safari_item(1)] * 21
+        self.assertEqual(self.client.post(URL, {"items": items}, format="json").status_code, 400)
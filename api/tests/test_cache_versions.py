@@ -0,0 +1,23 @@
+from api.cache import bump_version, get_version, model_scope
+from api.models import Vehicle
+
+from .base import APITestCase, make_vehicle
+
+
+class CacheVersionTests(APITestCase):
+
+    def test_bump_moves_the_version_forward(self):
+        before = get_version("pricing")
+        bump_version("pricing")
+        self.assertEqual(get_version("pricing"), before + 1)
+
+    def test_writes_bump_only_once_committed(self):
+        catalog, availability = get_version(model_scope(Vehicle)), get_version("availability")
+        with self.captureOnCommitCallbacks(execute=True):
+            make_vehicle()
+            # a reader in this window must not cache old rows under a new version
+            self.assertEqual(get_version(model_scope(Vehicle)), catalog)
+            self.assertEqual(get_version("availability"), availability)
+        self.assertGreater(get_version(model_scope(Vehicle)), catalog)
+        self.assertGreater(get_version("availability"), availability)
+
@@ -0,0 +1,68 @@
+from decimal import Decimal
+from unittest import mock
+
+from rest_framework.permissions import BasePermission
+
+from api.models import Booking
+from api.views import VehicleViewSet
+
+from .base import APITestCase, days_ahead, make_vehicle
+
+LIST_URL = "/api/vehicles/"
+
+
+class DenyObjects(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return False
+
+
+class ConditionalGetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.detail_url = f"/api/vehicles/{cls.vehicle.pk}/"
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get(LIST_URL)["ETag"]
+        response = self.client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_catalog_write_changes_the_etag(self):
+        etag = self.client.get(LIST_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vehicle.daily_rate = Decimal("120.00")
+            self.vehicle.save()
+        response = self.client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_last_modified_only_without_expand(self):
+        response = self.client.get(self.detail_url)
+        self.assertIn("Last-Modified", response)
+        not_modified = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        expanded = self.client.get(self.detail_url, {"expand": "category"})
+        self.assertIn("ETag", expanded)
+        self.assertNotIn("Last-Modified", expanded)
+
+    def test_object_permissions_run_before_304(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        with mock.patch.object(VehicleViewSet, "permission_classes", [DenyObjects]):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+
+    def test_expanding_a_model_without_a_counter_is_unconditional(self):
+        booking = Booking.objects.create(
+            user=self.customer, booking_type="vehicle", vehicle=self.vehicle,
+            start_date=days_ahead(3), total_price=Decimal("100.00"),
+        )
+        url = f"/api/bookings/{booking.pk}/"
+        self.assertIn("ETag", self.client.get(url))
+        response = self.client.get(url, {"expand": "user"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
@@ -0,0 +1,129 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+from django.utils import timezone
+
+from api.emails import queue_email
+from api.models import Booking, OutgoingEmail
+from api.tasks import send_queued_emails
+
+from .base import APITestCase, days_ahead
+
+send_messages = EmailBackend.send_messages
+
+
+def reject_bounces(backend, messages):
+    bounced = [address for message in messages for address in message.to if address.startswith("bounce")]
+    if bounced:
+        raise smtplib.SMTPRecipientsRefused({address: (550, b"mailbox unavailable") for address in bounced})
+    return send_messages(backend, messages)
+
+
+class StaleSessionBackend(EmailBackend):
+    """
+    A local memory backend still holding a session the server has dropped,
+    which like the SMTP backend's only reopens after close(). ``reopens``
+    reconnects succeed, later ones are refused.
+    """
+
+    def __init__(self, reopens=1, **kwargs):
+        super().__init__(**kwargs)
+        self.attached, self.alive, self.reopens = True, False, reopens
+
+    def open(self):
+        if self.attached:
+            return False
+        if not self.reopens:
+            raise ConnectionRefusedError("connection refused")
+        self.reopens -= 1
+        self.attached = self.alive = True
+        return True
+
+    def close(self):
+        self.attached = self.alive = False
+
+    def send_messages(self, messages):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+class EmailQueueTests(APITestCase):
+
+    def outgoing(self, *recipients):
+        return [OutgoingEmail.objects.create(to=[to], subject=f"To {to}", body="Hello") for to in recipients]
+
+    def test_queued_email_is_sent_once_committed(self):
+        booking = Booking.objects.create(
+            user=self.customer, booking_type="safari", start_date=days_ahead(3), total_price=100,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_email("booking_confirmation", {"booking": booking}, [self.customer.email])
+            queue_email("booking_confirmation", {"booking": booking}, ["second@example.com"])
+            self.assertEqual(mail.outbox, [])
+        self.assertEqual([message.to for message in mail.outbox], [[self.customer.email], ["second@example.com"]])
+        self.assertEqual(mail.outbox[0].subject, f"Booking Confirmation – {booking.id}")
+        self.assertEqual(mail.outbox[0].body, f"Hello {self.customer.username},\n\nYour booking is confirmed.")
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_drains_every_batch(self):
+        self.outgoing(*(f"guest{n}@example.com" for n in range(5)))
+        result = send_queued_emails(batch_size=2)
+        self.assertEqual((result["sent"], result["batches"]), (5, 3))
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failures_do_not_stop_the_drain(self):
+        bounce, *_ = self.outgoing("bounce@example.com", "a@example.com", "b@example.com", "c@example.com")
+        with mock.patch.object(EmailBackend, "send_messages", reject_bounces):
+            result = send_queued_emails(batch_size=2)
+        self.assertEqual((result["sent"], result["failed"]), (3, 1))
+        bounce.refresh_from_db()
+        self.assertEqual((bounce.status, bounce.attempts, bounce.claimed_until), ("pending", 1, None))
+        self.assertIn("550", bounce.last_error)
+        self.assertEqual(list(OutgoingEmail.objects.all()), [bounce])
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        bounce, = self.outgoing("bounce@example.com")
+        with mock.patch.object(EmailBackend, "send_messages", reject_bounces):
+            send_queued_emails()
+            send_queued_emails()
+        bounce.refresh_from_db()
+        self.assertEqual((bounce.status, bounce.attempts), ("failed", 2))
+        self.assertEqual(send_queued_emails()["batches"], 0)
+
+    def test_a_batch_with_no_deliveries_ends_the_run(self):
+        self.outgoing("bounce1@example.com", "bounce2@example.com", "ok@example.com")
+        with mock.patch.object(EmailBackend, "send_messages", reject_bounces):
+            result = send_queued_emails(batch_size=2)
+        self.assertEqual((result["sent"], result["failed"], result["batches"]), (0, 2, 1))
+
+    def test_claimed_rows_wait_for_their_lease(self):
+        claimed, abandoned = self.outgoing("claimed@example.com", "abandoned@example.com")
+        OutgoingEmail.objects.filter(pk=claimed.pk).update(claimed_until=timezone.now() + timedelta(minutes=5))
+        OutgoingEmail.objects.filter(pk=abandoned.pk).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        send_queued_emails()
+        self.assertEqual([message.to for message in mail.outbox], [["abandoned@example.com"]])
+        self.assertEqual(list(OutgoingEmail.objects.all()), [claimed])
+
+    def test_a_dropped_session_is_reopened(self):
+        self.outgoing("a@example.com", "b@example.com", "c@example.com")
+        with mock.patch("api.tasks.get_connection", return_value=StaleSessionBackend()):
+            result = send_queued_emails()
+        self.assertEqual((result["sent"], result["failed"], result["released"]), (3, 0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_rows_are_released_uncounted_when_the_session_stays_down(self):
+        self.outgoing("a@example.com", "b@example.com", "c@example.com")
+        with mock.patch("api.tasks.get_connection", return_value=StaleSessionBackend(reopens=0)):
+            result = send_queued_emails(batch_size=2)
+        self.assertEqual((result["sent"], result["failed"], result["released"], result["batches"]), (0, 0, 2, 1))
+        self.assertEqual(
+            list(OutgoingEmail.objects.values_list("status", "attempts", "claimed_until")),
+            [("pending", 0, None)] * 3,
+        )
@@ -0,0 +1,30 @@
+from .base import APITestCase, make_vehicle
+
+
+class SparseFieldsetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.url = f"/api/vehicles/{cls.vehicle.pk}/"
+
+    def test_fields_trims_the_output(self):
+        response = self.client.get(self.url, {"fields": "id,name"})
+        self.assertEqual(set(response.data), {"id", "name"})
+
+    def test_expand_nests_and_fields_reaches_into_it(self):
+        response = self.client.get(self.url, {"expand": "category", "fields": "name,category.name"})
+        self.assertEqual(response.data, {"name": "Land Cruiser", "category": {"name": "SUV"}})
+
+    def test_writes_ignore_fields_and_expand(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(
+            f"{self.url}?fields=id&expand=category",
+            {"name": "Renamed", "category": str(self.vehicle.category_id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.name, "Renamed")
+        self.assertEqual(response.data["category"], self.vehicle.category_id)
@@ -0,0 +1,68 @@
+from api.availability import reserve_vehicle
+from api.models import Vehicle, VehicleCategory
+
+from .base import APITestCase, days_ahead, make_safari, make_vehicle
+
+URL = "/api/vehicles/facets/"
+
+
+class VehicleFacetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.suv = make_vehicle(name="Land Cruiser", daily_rate="150000.00")
+        make_vehicle(name="Prado", daily_rate="90000.00", category=cls.suv.category)
+        van = VehicleCategory.objects.create(name="Van")
+        make_vehicle(name="Hiace", daily_rate="400000.00", category=van)
+        Vehicle.objects.filter(name="Hiace").update(seats=14)
+
+    def facets(self, params=None):
+        response = self.client.get(URL, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_every_facet_of_the_filtered_rows(self):
+        data = self.facets()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(data["facets"]["category"], [{"value": "SUV", "count": 2}, {"value": "Van", "count": 1}])
+        self.assertEqual([bucket["count"] for bucket in data["facets"]["seats"]], [0, 2, 0, 1])
+        self.assertEqual([bucket["count"] for bucket in data["facets"]["daily_rate"]], [1, 1, 0, 1, 0])
+
+        filtered = self.facets({"min_price": "100000"})
+        self.assertEqual(filtered["count"], 2)
+        self.assertEqual(filtered["facets"]["category"], [{"value": "SUV", "count": 1}, {"value": "Van", "count": 1}])
+
+    def test_equivalent_filters_share_an_entry(self):
+        self.assertEqual(self.facets({"category": "SUV"})["count"], 2)
+        # its version bump waits for a commit that never comes, so only a cached entry can still say 2
+        Vehicle.objects.filter(name="Prado").delete()
+        self.assertEqual(self.facets({"category": "suv"})["count"], 2)
+
+    def test_vehicle_write_invalidates(self):
+        self.assertEqual(self.facets({"category": "suv"})["count"], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_vehicle(name="Hilux", category=self.suv.category)
+        self.assertEqual(self.facets({"category": "suv"})["count"], 3)
+
+    def test_reservation_write_invalidates(self):
+        params = {"available_on": days_ahead(4)}
+        self.assertEqual(self.facets(params)["count"], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_vehicle(self.suv, days_ahead(3), days_ahead(5))
+        self.assertEqual(self.facets(params)["count"], 2)
+
+    def test_invalid_filter_is_rejected(self):
+        self.assertEqual(self.client.get(URL, {"min_seats": "many"}).status_code, 400)
+        self.assertEqual(self.client.get(URL, {"available_from": days_ahead(5), "available_to": days_ahead(1)}).status_code, 400)
+
+
+class SafariFacetTests(APITestCase):
+
+    def test_counts_regions_and_bands(self):
+        make_safari(name="Gorilla Trek", base_price="1200000.00")
+        make_safari(name="Chimp Walk", base_price="300000.00")
+        data = self.client.get("/api/safari-packages/facets/").json()
+        self.assertEqual(data["facets"]["region"], [{"value": "Bwindi", "count": 2}])
+        self.assertEqual([bucket["count"] for bucket in data["facets"]["base_price"]], [1, 0, 1, 0, 0])
+        self.assertEqual([bucket["count"] for bucket in data["facets"]["duration_days"]], [0, 2, 0, 0])
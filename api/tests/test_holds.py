@@ -0,0 +1,79 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from api.availability import reserve_vehicle
+from api.models import Booking, SafariDeparture, VehicleReservation
+from api.seats import reserve_seats
+from api.tasks import release_expired_holds
+
+from .base import APITestCase, days_ahead, make_safari, make_vehicle
+
+
+class HoldSweeperTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.safari = make_safari(seats=6)
+
+    def hold(self, minutes_left, **fields):
+        return Booking.objects.create(
+            user=self.customer, start_date=days_ahead(7), total_price=100, status="pending",
+            hold_expires_at=timezone.now() + timedelta(minutes=minutes_left), **fields,
+        )
+
+    def vehicle_hold(self, minutes_left):
+        booking = self.hold(minutes_left, booking_type="vehicle", vehicle=self.vehicle, end_date=days_ahead(8))
+        reserve_vehicle(self.vehicle, booking.start_date, booking.end_date, booking=booking)
+        return booking
+
+    def safari_hold(self, minutes_left, pax):
+        reserve_seats(self.safari, days_ahead(7), pax)
+        return self.hold(minutes_left, booking_type="safari", safari=self.safari, pax=pax)
+
+    def test_expired_holds_give_their_inventory_back(self):
+        car = self.vehicle_hold(-1)
+        groups = [self.safari_hold(-5, pax=2), self.safari_hold(-1, pax=3)]
+        live = self.safari_hold(10, pax=1)
+
+        result = release_expired_holds()
+
+        self.assertEqual(result["released"], 3)
+        self.assertEqual(
+            set(Booking.objects.filter(status="expired").values_list("pk", flat=True)),
+            {car.pk, *(booking.pk for booking in groups)},
+        )
+        live.refresh_from_db()
+        self.assertEqual(live.status, "pending")
+        self.assertFalse(VehicleReservation.objects.get(booking=car).is_active)
+        self.assertEqual(SafariDeparture.objects.get(safari=self.safari).seats_available, 5)
+
+    def test_confirmed_bookings_are_left_alone(self):
+        booking = self.vehicle_hold(-1)
+        Booking.objects.filter(pk=booking.pk).update(status="confirmed")
+        self.assertEqual(release_expired_holds()["released"], 0)
+        self.assertTrue(VehicleReservation.objects.get(booking=booking).is_active)
+
+    def test_sweeps_in_batches(self):
+        for _ in range(3):
+            self.safari_hold(-1, pax=1)
+        result = release_expired_holds(batch_size=2)
+        self.assertEqual((result["released"], result["batches"]), (3, 2))
+        self.assertEqual(SafariDeparture.objects.get(safari=self.safari).seats_available, 6)
+
+    def test_backfill_gives_old_pending_bookings_a_deadline(self):
+        pending, confirmed = self.hold(0), self.hold(0)
+        Booking.objects.filter(pk=pending.pk).update(hold_expires_at=None)
+        Booking.objects.filter(pk=confirmed.pk).update(hold_expires_at=None, status="confirmed")
+
+        import_module("api.migrations.0016_backfill_hold_expiry").hold_from_created(apps, None)
+
+        pending.refresh_from_db()
+        confirmed.refresh_from_db()
+        self.assertEqual(pending.hold_expires_at, pending.created_at + settings.BOOKING_HOLD_TTL)
+        self.assertIsNone(confirmed.hold_expires_at)
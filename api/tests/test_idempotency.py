@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.db import IntegrityError
+
+from api.models import Booking
+from api.serializers import BookingCreateSerializer
+
+from .base import APITestCase, days_ahead, make_vehicle
+
+URL = "/api/bookings/"
+
+
+class IdempotentBookingTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+
+    def payload(self, days=1):
+        return {
+            "booking_type": "vehicle", "vehicle": str(self.vehicle.pk),
+            "start_date": days_ahead(days), "end_date": days_ahead(days + 1),
+        }
+
+    def post(self, payload, key="booking-1"):
+        return self.client.post(URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.payload())
+        retry = self.post(self.payload())
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.post(self.payload())
+        self.assertEqual(self.post(self.payload(days=5)).status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post(self.payload())
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.post(self.payload(days=5)).status_code, 201)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_cache_outage_falls_back_to_the_database_constraint(self):
+        with mock.patch("api.idempotency.cache") as cache:
+            cache.get.return_value = cache.add.return_value = None
+            first = self.post(self.payload())
+            retry = self.post(self.payload())
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BookingCreateSerializerTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+
+    def save(self, key):
+        serializer = BookingCreateSerializer(data={
+            "booking_type": "vehicle", "vehicle": str(self.vehicle.pk),
+            "start_date": days_ahead(1), "idempotency_key": key,
+        })
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.customer)
+
+    def test_concurrent_duplicate_returns_the_winner(self):
+        winner = self.save("race")
+        # the duplicate misses the lookup and loses on the unique constraint instead
+        with mock.patch("django.db.models.query.QuerySet.first", return_value=None):
+            self.assertEqual(self.save("race"), winner)
+
+    def test_other_integrity_errors_are_not_mistaken_for_a_duplicate(self):
+        with mock.patch.object(BookingCreateSerializer, "_create_booking", side_effect=IntegrityError("other")):
+            with self.assertRaises(IntegrityError):
+                self.save("fresh")
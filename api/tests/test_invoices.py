@@ -0,0 +1,75 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.test import override_settings
+
+from api.invoices import publish_invoices, record_invoices, render_invoice_pdf
+from api.management.commands.bench_invoices import CREDENTIALS, _StubS3
+from api.models import Booking, Invoice, OutgoingEmail, Payment
+from api.tasks import generate_invoice_and_email
+from utils.s3 import build_s3_client
+
+from .base import APITestCase, days_ahead
+
+BUCKET = "invoice-test"
+
+
+@override_settings(AWS_STORAGE_BUCKET_NAME=BUCKET)
+class InvoicePipelineTests(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.s3 = _StubS3(latency=0)
+        threading.Thread(target=cls.s3.serve_forever, daemon=True).start()
+        cls.client_s3 = build_s3_client(endpoint_url=cls.s3.endpoint_url, **CREDENTIALS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.s3.shutdown()
+        cls.s3.server_close()
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.payments = [
+            Payment.objects.create(
+                booking=Booking.objects.create(
+                    user=cls.customer, booking_type="safari", start_date=days_ahead(3), total_price=100 + n,
+                ),
+                provider="pesapal", amount=Decimal(100 + n), status="success", transaction_ref=f"REF-{n}",
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.s3.keys.clear()
+
+    def test_renders_a_pdf(self):
+        self.assertTrue(render_invoice_pdf("booking", "100.00", "UGX").startswith(b"%PDF"))
+
+    def test_publishes_every_invoice(self):
+        progress = []
+        urls = publish_invoices(
+            self.payments, client=self.client_s3, on_progress=lambda done, total: progress.append((done, total)),
+        )
+        self.assertEqual(self.s3.keys, {f"/{BUCKET}/invoices/REF-{n}.pdf" for n in range(3)})
+        self.assertEqual(urls[self.payments[0].pk], f"https://{BUCKET}.s3.amazonaws.com/invoices/REF-0.pdf")
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    def test_recording_twice_updates_in_place(self):
+        payment = self.payments[0]
+        record_invoices({payment.pk: "https://example.com/old.pdf"})
+        record_invoices({payment.pk: "https://example.com/new.pdf"})
+        self.assertEqual(list(Invoice.objects.values_list("pdf_url", flat=True)), ["https://example.com/new.pdf"])
+
+    def test_task_uploads_records_and_queues_the_receipt(self):
+        payment = self.payments[1]
+        with mock.patch("api.invoices.get_s3_client", return_value=self.client_s3):
+            generate_invoice_and_email(str(payment.pk))
+        self.assertEqual(self.s3.keys, {f"/{BUCKET}/invoices/REF-1.pdf"})
+        self.assertEqual(payment.invoice.pdf_url, f"https://{BUCKET}.s3.amazonaws.com/invoices/REF-1.pdf")
+        self.assertEqual(OutgoingEmail.objects.get().to, [self.customer.email])
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+from api.models import Notification
+from api.notifications import unread_count
+
+from .base import APITestCase
+
+URL = "/api/notifications/"
+
+
+class UnreadCountTests(APITestCase):
+
+    def notify(self, count=1, user=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [
+                Notification.objects.create(user=user or self.customer, message=f"Note {n}") for n in range(count)
+            ]
+
+    def unread(self):
+        return self.client.get(f"{URL}unread-count/").data["unread"]
+
+    def test_counter_follows_new_and_read_notifications(self):
+        self.notify(2)
+        self.assertEqual(self.unread(), 2)
+        self.notify(1)
+        self.notify(1, user=self.admin)
+        self.assertEqual(self.unread(), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"{URL}mark-read/", {}, format="json")
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(self.unread(), 0)
+
+    def test_mark_read_only_touches_own_notifications(self):
+        mine, = self.notify(1)
+        theirs, = self.notify(1, user=self.admin)
+        response = self.client.post(f"{URL}mark-read/", {"ids": [str(mine.pk), str(theirs.pk)]}, format="json")
+        self.assertEqual(response.data["updated"], 1)
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.is_read)
+
+    def test_deletes_drop_the_counter(self):
+        first, _ = self.notify(2)
+        self.assertEqual(self.unread(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.unread(), 1)
+
+    def test_cache_outage_is_not_an_error(self):
+        self.notify(1)
+        with mock.patch("api.notifications.cache") as cache:
+            cache.get.return_value = cache.incr.return_value = None
+            self.notify(1)
+            self.assertEqual(self.unread(), 2)
+
+    def test_notification_committed_during_a_recount_is_not_lost(self):
+        self.notify(1)
+        add = cache.add
+
+        def add_after_a_concurrent_notification(*args, **kwargs):
+            self.notify(1)  # its increment finds no counter yet
+            return add(*args, **kwargs)
+
+        with mock.patch("api.notifications.cache.add", add_after_a_concurrent_notification):
+            self.assertEqual(unread_count(self.customer.pk), 2)
+        self.assertEqual(self.unread(), 2)
+        self.notify(1)
+        self.assertEqual(self.unread(), 3)
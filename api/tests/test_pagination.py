@@ -0,0 +1,76 @@
+import base64
+
+from django.test import override_settings
+
+from api.models import Vehicle
+
+from .base import APITestCase, make_vehicle
+
+URL = "/api/vehicles/"
+
+
+class KeysetPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = make_vehicle(name="Vehicle 0", daily_rate="100.00").category
+        # ties in daily_rate, so the pk tie-breaker decides the order inside each group
+        for n, rate in enumerate(["100.00", "100.00", "100.00", "80.00", "80.00", "80.00"], start=1):
+            make_vehicle(name=f"Vehicle {n}", daily_rate=rate, category=category)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [str(vehicle["id"]) for vehicle in response.data["results"]]
+
+    def expected_ids(self, *ordering):
+        return [str(pk) for pk in Vehicle.objects.order_by(*ordering).values_list("pk", flat=True)]
+
+    def walk(self, params, link):
+        """Follow ``link`` ("next" or "previous") from the first page, returning every page's ids."""
+        response = self.client.get(URL, params)
+        pages = [self.ids(response)]
+        while response.data[link]:
+            response = self.client.get(response.data[link])
+            pages.append(self.ids(response))
+        return pages, response
+
+    def test_forward_and_back_over_ties(self):
+        pages, last = self.walk({"ordering": "daily_rate", "page_size": 2}, "next")
+        self.assertEqual(sum(pages, []), self.expected_ids("daily_rate", "pk"))
+        self.assertIsNone(last.data["next"])
+
+        backwards = [self.ids(last)]
+        response = last
+        while response.data["previous"]:
+            response = self.client.get(response.data["previous"])
+            backwards.append(self.ids(response))
+        self.assertEqual(backwards, pages[::-1])
+        self.assertIsNone(response.data["previous"])
+
+    def test_descending_ordering_override(self):
+        pages, _ = self.walk({"ordering": "-daily_rate", "page_size": 3}, "next")
+        self.assertEqual(sum(pages, []), self.expected_ids("-daily_rate", "-pk"))
+
+    def test_default_ordering_is_name(self):
+        pages, _ = self.walk({"page_size": 4}, "next")
+        self.assertEqual(sum(pages, []), self.expected_ids("name", "pk"))
+
+    def test_tampered_cursor_is_not_found(self):
+        next_page = self.client.get(URL, {"page_size": 2}).data["next"]
+        self.assertEqual(self.client.get(URL, {"cursor": "not-a-cursor!"}).status_code, 404)
+        wrong_length = base64.urlsafe_b64encode(b'{"v":["Vehicle 1"],"r":0}').decode()
+        self.assertEqual(self.client.get(URL, {"cursor": wrong_length}).status_code, 404)
+        self.assertEqual(self.client.get(next_page.replace("cursor=", "cursor=x")).status_code, 404)
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.ids(self.client.get(URL, {"page_size": 500}))), 3)
+        self.assertEqual(len(self.ids(self.client.get(URL, {"page_size": 0}))), 1)
+
+    def test_count_only_on_request(self):
+        self.assertNotIn("count", self.client.get(URL).data)
+        self.assertEqual(self.client.get(URL, {"count": "exact", "page_size": 2}).data["count"], 7)
+        estimate = self.client.get(URL, {"count": "estimate", "page_size": 2}).data["count"]
+        self.assertIsInstance(estimate, int)
+        self.assertGreaterEqual(estimate, 1)
@@ -0,0 +1,111 @@
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from api import pricing
+from api.models import Booking, SeasonalRate
+from api.pricing import build_rate_table, get_rate_table, multiplier_sum, safari_price, vehicle_price
+
+from .base import APITestCase, days_ahead, make_safari, make_vehicle
+
+
+class PricingTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle(daily_rate="100.00")
+        cls.safari = make_safari(base_price="500.00")
+
+    def setUp(self):
+        super().setUp()
+        pricing._local.update(version=None, table=None)
+
+    def season(self, start, end, multiplier, applies_to="all"):
+        return SeasonalRate.objects.create(
+            name="Season", applies_to=applies_to,
+            start_date=days_ahead(start), end_date=days_ahead(end), multiplier=Decimal(multiplier),
+        )
+
+
+class SeasonLookupTests(PricingTestCase):
+
+    def test_days_outside_every_season_count_once(self):
+        table = build_rate_table()
+        self.assertEqual(multiplier_sum(table, "vehicle", days_ahead(1), days_ahead(10)), 10)
+
+    def test_prefix_sums_cover_partial_overlaps(self):
+        self.season(5, 9, "1.50")
+        table = build_rate_table()
+        # days 3-4 at 1x, 5-9 at 1.5x, 10-11 at 1x
+        self.assertEqual(multiplier_sum(table, "vehicle", days_ahead(3), days_ahead(11)), Decimal("11.50"))
+        self.assertEqual(multiplier_sum(table, "vehicle", days_ahead(6), days_ahead(6)), Decimal("1.50"))
+        self.assertEqual(vehicle_price(table, Decimal("100.00"), days_ahead(4), days_ahead(5)), Decimal("250.00"))
+
+    def test_overlapping_seasons_take_the_highest_multiplier(self):
+        self.season(1, 10, "1.20")
+        self.season(5, 6, "2.00")
+        self.season(6, 8, "0.50")
+        table = build_rate_table()
+        self.assertEqual(multiplier_sum(table, "vehicle", days_ahead(4), days_ahead(7)), Decimal("6.40"))
+
+    def test_seasons_only_apply_to_their_kind(self):
+        self.season(1, 10, "2.00", applies_to="vehicle")
+        table = build_rate_table()
+        self.assertEqual(safari_price(table, Decimal("500.00"), days_ahead(3), 2), Decimal("1000.00"))
+        self.assertEqual(vehicle_price(table, Decimal("100.00"), days_ahead(3)), Decimal("200.00"))
+
+
+class RateTableCacheTests(PricingTestCase):
+
+    def test_table_is_reused_until_pricing_changes(self):
+        get_rate_table()
+        with mock.patch("api.pricing.build_rate_table") as build:
+            get_rate_table()
+        build.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.season(1, 1, "3.00")
+        table = get_rate_table()
+        self.assertEqual(multiplier_sum(table, "vehicle", days_ahead(1), days_ahead(1)), Decimal("3.00"))
+
+    def test_another_process_reuses_the_shared_copy(self):
+        get_rate_table()
+        pricing._local.update(version=None, table=None)  # a fresh worker
+        with mock.patch("api.pricing.build_rate_table") as build:
+            table = get_rate_table()
+        build.assert_not_called()
+        self.assertEqual(table["vehicle"][str(self.vehicle.pk)], Decimal("100.00"))
+
+
+class QuoteEndpointTests(PricingTestCase):
+
+    def test_prices_each_item_and_reports_errors_per_item(self):
+        self.season(1, 2, "1.50", applies_to="vehicle")
+        items = [
+            {
+                "booking_type": "vehicle", "vehicle": str(self.vehicle.pk),
+                "start_date": days_ahead(1), "end_date": days_ahead(3),
+            },
+            {"booking_type": "safari", "safari": str(self.safari.pk), "start_date": days_ahead(1), "pax": 3},
+            {"booking_type": "vehicle", "vehicle": str(uuid.uuid4()), "start_date": days_ahead(1)},
+        ]
+        response = self.client.post("/api/quotes/batch/", {"items": items}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["quotes"], [
+            {"total_price": "400.00"}, {"total_price": "1500.00"}, {"error": "Unknown vehicle."},
+        ])
+
+    def test_malformed_items_fail_the_request(self):
+        items = [{"booking_type": "vehicle", "start_date": days_ahead(1)}]
+        self.assertEqual(self.client.post("/api/quotes/batch/", {"items": items}, format="json").status_code, 400)
+
+    def test_bookings_are_priced_server_side(self):
+        self.season(1, 1, "2.00")
+        payload = {
+            "booking_type": "vehicle", "vehicle": str(self.vehicle.pk),
+            "start_date": days_ahead(1), "end_date": days_ahead(2), "total_price": "1.00",
+        }
+        response = self.client.post("/api/bookings/", payload, format="json")
+        self.assertEqual(response.data["total_price"], "300.00")
+        self.assertEqual(Booking.objects.get().total_price, Decimal("300.00"))
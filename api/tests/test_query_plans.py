@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+
+from api.models import (
+    Booking, Notification, OutgoingEmail, Payment, Review, SafariPackage, User, Vehicle,
+    VehicleCategory, VehicleReservation, WebhookEvent,
+)
+from api.query_plans import HOT_QUERIES, plan_indexes
+from api.search import update_search_vectors
+
+from .base import APITestCase, has_constraint, seed_reservation_history
+
+SEEDED_TABLES = [
+    User, VehicleCategory, Vehicle, VehicleReservation, SafariPackage, Booking, Payment,
+    Notification, Review, OutgoingEmail, WebhookEvent,
+]
+
+
+class HotQueryPlanTests(APITestCase):
+    """
+    Every registered hot query, EXPLAINed with the planner left alone. The
+    data is shaped like production: mostly history, with the pending or
+    unread tail each partial index covers kept small.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now, today = timezone.now(), timezone.localdate()
+        users = User.objects.bulk_create(
+            User(username=f"traveller{i}", email=f"traveller{i}@example.com") for i in range(200)
+        )
+        category = VehicleCategory.objects.create(name="Van")
+        vehicles = Vehicle.objects.bulk_create(
+            Vehicle(category=category, name=f"Minibus {i}", description="Pop-up roof", seats=7, daily_rate=Decimal("80.00"))
+            for i in range(1000)
+        )
+        safaris = SafariPackage.objects.bulk_create(
+            SafariPackage(
+                name=f"Savannah Circuit {i}", description="Game drives", region="Queen Elizabeth",
+                duration_days=4, base_price=Decimal("900.00"), seats_available=8,
+            )
+            for i in range(1000)
+        )
+        update_search_vectors(Vehicle.objects.all())
+        update_search_vectors(SafariPackage.objects.all())
+        seed_reservation_history(vehicles)
+        bookings = Booking.objects.bulk_create(
+            Booking(
+                user=users[i % len(users)], booking_type="safari", safari=safaris[i % len(safaris)],
+                start_date=today, total_price=Decimal("900.00"),
+                status="pending" if i % 50 == 0 else "confirmed",
+                hold_expires_at=now + timedelta(minutes=i - 5000) if i % 50 == 0 else None,
+            )
+            for i in range(10000)
+        )
+        Payment.objects.bulk_create(
+            Payment(booking=booking, provider="stripe", amount=booking.total_price, transaction_ref=f"txn-{i}")
+            for i, booking in enumerate(bookings)
+        )
+        Notification.objects.bulk_create(
+            Notification(user=users[i % len(users)], message="Booking confirmed", is_read=i % 20 != 0)
+            for i in range(10000)
+        )
+        Review.objects.bulk_create(
+            Review(
+                user=users[i % len(users)], rating=Decimal("4.5"),
+                safari=safaris[i % len(safaris)] if i % 2 else None,
+                vehicle=None if i % 2 else vehicles[i % len(vehicles)],
+            )
+            for i in range(10000)
+        )
+        OutgoingEmail.objects.bulk_create(
+            OutgoingEmail(to=["someone@example.com"], subject="Receipt", body="...", status="pending" if i % 50 == 0 else "failed")
+            for i in range(5000)
+        )
+        WebhookEvent.objects.bulk_create(
+            WebhookEvent(
+                provider="stripe", dedupe_key=f"evt-{i}", payload={},
+                status="pending" if i % 100 == 0 else "processed",
+            )
+            for i in range(10000)
+        )
+        with connection.cursor() as cursor:
+            # what autovacuum would have done by now: fold the GIN pending lists into the search indexes
+            cursor.execute("SELECT gin_clean_pending_list('vehicle_search_idx'), gin_clean_pending_list('safari_search_idx')")
+            # ANALYZE counts rows inserted by its own, still open, transaction
+            cursor.execute(f"ANALYZE {', '.join(model._meta.db_table for model in SEEDED_TABLES)}")
+
+    def test_every_hot_query_uses_its_index(self):
+        for name, (build, index) in HOT_QUERIES.items():
+            with self.subTest(name):
+                if name == "vehicle_reservation_overlap" and not has_constraint("vehicle_reservation_no_overlap"):
+                    self.skipTest("database has no vehicle_reservation_no_overlap constraint")
+                used = plan_indexes(build())
+                expected = index if isinstance(index, tuple) else (index,)
+                self.assertTrue(
+                    any(used_name.startswith(expected) for used_name in used),
+                    f"expected {' or '.join(expected)}, plan used {used or 'no index'}",
+                )
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+
+from api.models import Review, Vehicle
+from api.ratings import reconcile
+
+from .base import TEST_SETTINGS, APITestCase, make_safari, make_user, make_vehicle
+
+
+class RatingAggregateTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+        cls.safari = make_safari()
+
+    def assertRating(self, target, count, average):
+        target.refresh_from_db()
+        self.assertEqual((target.review_count, target.average_rating), (count, Decimal(average)))
+
+    def test_follows_review_writes(self):
+        first = Review.objects.create(user=self.customer, vehicle=self.vehicle, rating=4, comment="Good")
+        Review.objects.create(user=self.admin, vehicle=self.vehicle, rating=5, comment="Great")
+        self.assertRating(self.vehicle, 2, "4.50")
+        first.rating = 2
+        first.save()
+        self.assertRating(self.vehicle, 2, "3.50")
+        first.delete()
+        self.assertRating(self.vehicle, 1, "5.00")
+
+    def test_moving_a_review_refreshes_both_targets(self):
+        review = Review.objects.create(user=self.customer, vehicle=self.vehicle, rating=4, comment="Good")
+        review.vehicle, review.safari = None, self.safari
+        review.save()
+        self.assertRating(self.vehicle, 0, "0.00")
+        self.assertRating(self.safari, 1, "4.00")
+
+    def test_reconcile_repairs_only_drifted_rows(self):
+        Review.objects.create(user=self.customer, vehicle=self.vehicle, rating=3, comment="Ok")
+        make_vehicle(name="Untouched", category=self.vehicle.category)
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(review_count=7, average_rating=1)
+        self.assertEqual(reconcile(Vehicle), 1)
+        self.assertRating(self.vehicle, 1, "3.00")
+
+
+@override_settings(**TEST_SETTINGS)
+class ConcurrentReviewTests(TransactionTestCase):
+
+    def test_concurrent_reviews_are_all_counted(self):
+        vehicle = make_vehicle()
+        users = [make_user(f"reviewer{n}") for n in range(4)]
+        ready = threading.Barrier(len(users))
+
+        def review(user):
+            try:
+                with transaction.atomic():
+                    ready.wait()
+                    Review.objects.create(user=user, vehicle=vehicle, rating=4, comment="Good")
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(len(users)) as pool:
+            list(pool.map(review, users))
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.review_count, len(users))
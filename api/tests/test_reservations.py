@@ -0,0 +1,55 @@
+from django.db import IntegrityError, transaction
+
+from api.availability import ReservationConflict, is_vehicle_free, reservation_period, reserve_vehicle
+from api.models import VehicleReservation
+
+from .base import APITestCase, days_ahead, has_constraint, make_vehicle
+
+
+class ReserveVehicleTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vehicle = make_vehicle()
+
+    def test_period_includes_end_date(self):
+        reservation = reserve_vehicle(self.vehicle, days_ahead(1), days_ahead(3))
+        self.assertEqual((reservation.start_date, reservation.end_date), (days_ahead(1), days_ahead(3)))
+        self.assertFalse(is_vehicle_free(self.vehicle, days_ahead(3)))
+        self.assertTrue(is_vehicle_free(self.vehicle, days_ahead(4)))
+
+    def test_overlapping_range_conflicts(self):
+        reserve_vehicle(self.vehicle, days_ahead(1), days_ahead(3))
+        with self.assertRaises(ReservationConflict):
+            reserve_vehicle(self.vehicle, days_ahead(3), days_ahead(5))
+        self.assertEqual(VehicleReservation.objects.filter(vehicle=self.vehicle).count(), 1)
+
+    def test_adjacent_ranges_and_inactive_reservations_do_not_conflict(self):
+        first = reserve_vehicle(self.vehicle, days_ahead(1), days_ahead(3))
+        reserve_vehicle(self.vehicle, days_ahead(4), days_ahead(6))
+        first.is_active = False
+        first.save()
+        reserve_vehicle(self.vehicle, days_ahead(2), days_ahead(2))
+
+    def test_other_vehicles_are_unaffected(self):
+        reserve_vehicle(self.vehicle, days_ahead(1), days_ahead(3))
+        reserve_vehicle(make_vehicle(name="Prado", category=self.vehicle.category), days_ahead(1), days_ahead(3))
+
+    def test_exclusion_constraint_rejects_overlap_that_skips_the_check(self):
+        if not has_constraint("vehicle_reservation_no_overlap"):
+            self.skipTest("exclusion constraint needs the btree_gist extension")
+        VehicleReservation.objects.create(vehicle=self.vehicle, period=reservation_period(days_ahead(1), days_ahead(3)))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VehicleReservation.objects.create(vehicle=self.vehicle, period=reservation_period(days_ahead(2)))
+
+    def test_vehicle_booking_conflict_is_a_400(self):
+        payload = {
+            "booking_type": "vehicle", "vehicle": str(self.vehicle.pk),
+            "start_date": days_ahead(1), "end_date": days_ahead(3), "total_price": "300.00",
+        }
+        self.assertEqual(self.client.post("/api/bookings/", payload, format="json").status_code, 201)
+        payload.update(start_date=days_ahead(2), end_date=days_ahead(4))
+        response = self.client.post("/api/bookings/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(VehicleReservation.objects.filter(vehicle=self.vehicle).count(), 1)
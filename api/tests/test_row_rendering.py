@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import SafariPackage, Vehicle
+from api.row_rendering import compile_row_renderer
+from api.serializers import BookingSerializer, SafariPackageSerializer, VehicleSerializer
+
+from .base import APITestCase, make_safari, make_vehicle
+
+
+class RowRendererParityTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = make_vehicle(name="With image", daily_rate="120.50").category
+        Vehicle.objects.filter(category=category).update(image="vehicles/1.jpg")
+        make_vehicle(name="Without image", daily_rate="99.00", category=category)
+        make_safari(name="Featured")
+        SafariPackage.objects.update(is_featured=True, average_rating=Decimal("4.25"))
+        make_safari(name="Plain")
+
+    def assertSameOutput(self, serializer_class, fields=""):
+        request = Request(APIRequestFactory().get("/", {"fields": fields} if fields else {}))
+        queryset = serializer_class.Meta.model.objects.order_by("name")
+        expected = serializer_class(queryset, many=True, context={"request": request}).data
+        columns, render = compile_row_renderer(serializer_class(context={"request": request}))
+        actual = [render(row) for row in queryset.values(*columns)]
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_matches_the_serializer(self):
+        for serializer_class in (VehicleSerializer, SafariPackageSerializer):
+            for fields in ("", "id,name,created_at", "image,daily_rate,base_price,category"):
+                with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                    self.assertSameOutput(serializer_class, fields)
+
+    def test_serializers_needing_instances_fall_back(self):
+        request = Request(APIRequestFactory().get("/", {"expand": "vehicle"}))
+        self.assertIsNone(compile_row_renderer(BookingSerializer(context={"request": request})))
+
+    def test_list_endpoint_serves_the_same_rows(self):
+        response = self.client.get("/api/vehicles/")
+        expected = VehicleSerializer(
+            Vehicle.objects.filter(pk__in=[row["id"] for row in response.data["results"]]),
+            many=True, context={"request": Request(response.wsgi_request)},
+        ).data
+        self.assertCountEqual(
+            [JSONRenderer().render(row) for row in response.data["results"]],
+            [JSONRenderer().render(row) for row in expected],
+        )
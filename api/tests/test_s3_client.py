@@ -0,0 +1,46 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from utils.s3 import build_s3_client, get_s3_client, reset_s3_client
+
+CREDENTIALS = {
+    "AWS_ACCESS_KEY_ID": "test", "AWS_SECRET_ACCESS_KEY": "test", "AWS_S3_REGION_NAME": "us-east-1",
+}
+
+
+@override_settings(**CREDENTIALS)
+class SharedS3ClientTests(SimpleTestCase):
+
+    def setUp(self):
+        reset_s3_client()
+        self.addCleanup(reset_s3_client)
+
+    def test_one_client_per_process(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(get_s3_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.assertIs(get_s3_client(), clients[0])
+
+    def test_settings_change_rebuilds_the_client(self):
+        default = get_s3_client()
+        with override_settings(AWS_S3_ENDPOINT_URL="http://127.0.0.1:9000"):
+            stub = get_s3_client()
+            self.assertIsNot(stub, default)
+            self.assertEqual(stub.meta.endpoint_url, "http://127.0.0.1:9000")
+        self.assertNotEqual(get_s3_client().meta.endpoint_url, "http://127.0.0.1:9000")
+
+    def test_custom_endpoints_use_path_style_addressing(self):
+        with override_settings(AWS_S3_ENDPOINT_URL="http://127.0.0.1:9000"):
+            self.assertEqual(build_s3_client().meta.config.s3["addressing_style"], "path")
+            url = build_s3_client().generate_presigned_url("get_object", Params={"Bucket": "media", "Key": "a.jpg"})
+        self.assertTrue(url.startswith("http://127.0.0.1:9000/media/a.jpg?"))
+        self.assertEqual(build_s3_client().meta.config.s3["addressing_style"], "auto")
+
+    def test_overrides_replace_individual_options(self):
+        client = build_s3_client(region_name="eu-west-1")
+        self.assertEqual(client.meta.region_name, "eu-west-1")
@@ -0,0 +1,53 @@
+from .base import APITestCase, make_safari, make_vehicle
+
+URL = "/api/vehicles/"
+
+
+class FullTextSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cruiser = make_vehicle(name="Land Cruiser")
+        cls.category = cls.cruiser.category
+        cls.van = make_vehicle(name="Bush Van", category=cls.category)
+        cls.van.description = "Roomier than a cruiser"
+        cls.van.save()
+        make_vehicle(name="Minibus", category=cls.category)
+
+    def names(self, params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [vehicle["name"] for vehicle in response.data["results"]]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self.names({"search": "cruiser"}), ["Land Cruiser", "Bush Van"])
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(self.names({"search": "cru"}), ["Land Cruiser", "Bush Van"])
+        self.assertEqual(self.names({"search": "land cru"}), ["Land Cruiser"])
+
+    def test_category_rename_refreshes_vehicle_vectors(self):
+        self.assertEqual(self.names({"search": "overland"}), [])
+        self.category.name = "Overland"
+        self.category.save()
+        self.assertEqual(self.names({"search": "overland"}), ["Bush Van", "Land Cruiser", "Minibus"])
+
+    def test_input_without_words_matches_nothing(self):
+        self.assertEqual(self.names({"search": "!!! ?"}), [])
+        self.assertEqual(len(self.names({"search": "  "})), 3)
+
+    def test_rank_order_survives_the_cursor(self):
+        first = self.client.get(URL, {"search": "cruiser", "page_size": 1})
+        self.assertEqual([vehicle["name"] for vehicle in first.data["results"]], ["Land Cruiser"])
+        second = self.client.get(first.data["next"])
+        self.assertEqual([vehicle["name"] for vehicle in second.data["results"]], ["Bush Van"])
+        self.assertIsNone(second.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual([vehicle["name"] for vehicle in back.data["results"]], ["Land Cruiser"])
+
+    def test_safaris_search_name_and_region(self):
+        make_safari(name="Gorilla Trek")
+        make_safari(name="Chimp Walk")
+        response = self.client.get("/api/safari-packages/", {"search": "bwindi gor"})
+        self.assertEqual([safari["name"] for safari in response.data["results"]], ["Gorilla Trek"])
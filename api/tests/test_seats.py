@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from api.models import Booking, SafariDeparture
+from api.seats import SeatsUnavailable, release_seats, reserve_seats
+
+from .base import TEST_SETTINGS, APITestCase, days_ahead, make_safari
+
+
+class SeatInventoryTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.safari = make_safari(seats=5)
+
+    def seats_left(self, departure_date):
+        return SafariDeparture.objects.get(safari=self.safari, departure_date=departure_date).seats_available
+
+    def test_first_booking_opens_the_departure_at_capacity(self):
+        reserve_seats(self.safari, days_ahead(7), 2)
+        self.assertEqual(self.seats_left(days_ahead(7)), 3)
+
+    def test_departures_are_counted_separately(self):
+        reserve_seats(self.safari, days_ahead(7), 5)
+        reserve_seats(self.safari, days_ahead(8), 5)
+        self.assertEqual(self.seats_left(days_ahead(8)), 0)
+
+    def test_overbooking_leaves_the_count_alone(self):
+        reserve_seats(self.safari, days_ahead(7), 4)
+        with self.assertRaises(SeatsUnavailable):
+            reserve_seats(self.safari, days_ahead(7), 2)
+        self.assertEqual(self.seats_left(days_ahead(7)), 1)
+
+    def test_released_seats_can_be_booked_again(self):
+        reserve_seats(self.safari, days_ahead(7), 5)
+        release_seats(self.safari.pk, days_ahead(7), 3)
+        reserve_seats(self.safari, days_ahead(7), 3)
+        self.assertEqual(self.seats_left(days_ahead(7)), 0)
+
+    def test_booking_endpoint_decrements_and_refuses_when_full(self):
+        payload = {"booking_type": "safari", "safari": str(self.safari.pk), "start_date": days_ahead(7), "pax": 4}
+        self.assertEqual(self.client.post("/api/bookings/", payload, format="json").status_code, 201)
+        self.assertEqual(self.client.post("/api/bookings/", payload, format="json").status_code, 400)
+        self.assertEqual(self.seats_left(days_ahead(7)), 1)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class DeparturesEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.safari = make_safari(seats=5)
+        cls.url = f"/api/safari-packages/{cls.safari.pk}/departures/"
+
+    def test_lists_departures_in_the_window(self):
+        reserve_seats(self.safari, days_ahead(3), 2)
+        reserve_seats(self.safari, days_ahead(30), 1)
+        response = self.client.get(self.url, {"from": days_ahead(0), "to": days_ahead(10)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["capacity"], 5)
+        self.assertEqual([d["seats_available"] for d in response.data["departures"]], [3])
+
+    def test_rejects_bad_dates_and_oversized_windows(self):
+        for params in (
+            {"from": "2024-02-30"},
+            {"to": "next week"},
+            {"from": days_ahead(5), "to": days_ahead(1)},
+            {"from": days_ahead(0), "to": days_ahead(400)},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class ConcurrentSeatTests(TransactionTestCase):
+
+    def test_concurrent_buyers_never_oversell(self):
+        safari = make_safari(seats=3)
+
+        def buy(_):
+            try:
+                reserve_seats(safari, days_ahead(7), 1)
+                return True
+            except SeatsUnavailable:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(buy, range(8)))
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(SafariDeparture.objects.get(safari=safari).seats_available, 0)
@@ -0,0 +1,53 @@
+import base64
+import json
+
+from django.test import override_settings
+
+from utils.s3 import MAX_UPLOAD_SIZE
+
+from .base import APITestCase
+
+URL = "/api/uploads/presigned-url/"
+BATCH_URL = "/api/uploads/presigned-url/batch/"
+
+
+def policy_conditions(upload):
+    return json.loads(base64.b64decode(upload["fields"]["policy"]))["conditions"]
+
+
+@override_settings(
+    AWS_ACCESS_KEY_ID="test", AWS_SECRET_ACCESS_KEY="test", AWS_S3_REGION_NAME="us-east-1",
+    AWS_STORAGE_BUCKET_NAME="uploads-test",
+)
+class PresignedUploadTests(APITestCase):
+
+    def files(self, count, size=1024):
+        return [{"file_name": f"photo{n}.jpg", "file_type": "image/jpeg", "size": size} for n in range(count)]
+
+    def test_single_upload_is_size_limited(self):
+        response = self.client.post(URL, {"file_name": "photo.jpg", "file_type": "image/jpeg"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["key"].endswith("_photo.jpg"))
+        self.assertIn(["content-length-range", 1, MAX_UPLOAD_SIZE], policy_conditions(response.data))
+        self.assertIn({"Content-Type": "image/jpeg"}, policy_conditions(response.data))
+
+    def test_single_upload_needs_name_and_type(self):
+        response = self.client.post(URL, {"file_name": "photo.jpg"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_signs_every_file(self):
+        response = self.client.post(BATCH_URL, {"files": self.files(3)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        uploads = response.data["uploads"]
+        self.assertEqual(len({upload["key"] for upload in uploads}), 3)
+        for upload in uploads:
+            self.assertIn(["content-length-range", 1, MAX_UPLOAD_SIZE], policy_conditions(upload))
+
+    def test_batch_is_limited_to_50_files(self):
+        self.assertEqual(self.client.post(BATCH_URL, {"files": self.files(50)}, format="json").status_code, 200)
+        self.assertEqual(self.client.post(BATCH_URL, {"files": self.files(51)}, format="json").status_code, 400)
+
+    def test_oversized_file_is_rejected_before_signing(self):
+        response = self.client.post(BATCH_URL, {"files": self.files(1, size=MAX_UPLOAD_SIZE + 1)}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("size", response.data["files"][0])
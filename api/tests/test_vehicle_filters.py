@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.db import connection
+
+from api.availability import reserve_vehicle
+from api.filters import VehicleFilter
+from api.models import Vehicle, VehicleCategory
+from api.query_plans import plan_indexes
+
+from .base import APITestCase, days_ahead, has_constraint, make_vehicle, seed_reservation_history
+
+URL = "/api/vehicles/"
+
+
+class AvailableRangeFilterTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.busy = make_vehicle(name="Busy")
+        cls.free = make_vehicle(name="Free", category=cls.busy.category)
+
+    def names(self, params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(vehicle["name"] for vehicle in response.data["results"])
+
+    def test_hides_vehicles_reserved_on_any_day_of_the_range(self):
+        reserve_vehicle(self.busy, days_ahead(5), days_ahead(6))
+        self.assertEqual(self.names({"available_from": days_ahead(1), "available_to": days_ahead(5)}), ["Free"])
+        self.assertEqual(self.names({"available_from": days_ahead(7), "available_to": days_ahead(9)}), ["Busy", "Free"])
+
+    def test_a_single_bound_checks_that_day(self):
+        reserve_vehicle(self.busy, days_ahead(5))
+        self.assertEqual(self.names({"available_to": days_ahead(5)}), ["Free"])
+
+    def test_reversed_range_is_rejected(self):
+        response = self.client.get(URL, {"available_from": days_ahead(5), "available_to": days_ahead(1)})
+        self.assertEqual(response.status_code, 400)
+
+
+class AvailableRangePlanTests(APITestCase):
+    """The range filter's NOT EXISTS must stay on the exclusion constraint's GiST index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = VehicleCategory.objects.create(name="Van")
+        seed_reservation_history(Vehicle.objects.bulk_create(
+            Vehicle(category=category, name=f"Minibus {i}", seats=7, daily_rate=Decimal("80.00")) for i in range(1000)
+        ))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_vehicle, api_vehiclereservation")
+
+    def test_range_filter_uses_the_overlap_index(self):
+        if not has_constraint("vehicle_reservation_no_overlap"):
+            self.skipTest("database has no vehicle_reservation_no_overlap constraint")
+        queryset = VehicleFilter({"available_from": days_ahead(1), "available_to": days_ahead(7)}).qs
+        self.assertIn("vehicle_reservation_no_overlap", plan_indexes(queryset))
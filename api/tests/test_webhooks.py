@@ -0,0 +1,89 @@
+from unittest import mock
+
+from api.models import Booking, Payment, WebhookEvent
+from api.tasks import process_webhook_events
+from api.webhooks import replay
+
+from .base import APITestCase, days_ahead, make_user
+
+URL = "/api/payments/pesapal/webhook/"
+
+
+@mock.patch("api.tasks.send_booking_email.delay")
+@mock.patch("api.tasks.generate_invoice_and_email.delay")
+class WebhookInboxTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.booking = Booking.objects.create(
+            user=cls.customer, booking_type="safari", start_date=days_ahead(3), total_price=100, status="pending",
+        )
+        cls.payment = Payment.objects.create(
+            booking=cls.booking, provider="pesapal", amount=100, status="pending", transaction_ref="REF-1",
+        )
+
+    def notify(self, reference="REF-1", status="COMPLETED"):
+        return self.client.post(URL, {"reference": reference, "status": status}, format="json")
+
+    def test_acknowledges_and_collapses_retries(self, *mocks):
+        self.assertEqual(self.notify().data["detail"], "received")
+        self.assertEqual(self.notify().data["detail"], "already received")
+        self.notify(status="FAILED")  # a new status is a new event
+        self.assertEqual(WebhookEvent.objects.count(), 2)
+        self.assertEqual(self.notify(reference="").status_code, 400)
+
+    def test_confirms_the_booking_after_the_response(self, invoice_delay, email_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+            self.payment.refresh_from_db()
+            self.assertEqual(self.payment.status, "pending")
+        self.payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual((self.payment.status, self.booking.status), ("success", "confirmed"))
+        self.assertIsNone(self.booking.hold_expires_at)
+        invoice_delay.assert_called_once_with(str(self.payment.pk))
+        email_delay.assert_called_once_with(str(self.booking.pk))
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.result, event.attempts), ("processed", "payment confirmed", 1))
+
+    def test_unknown_payment_stays_failed(self, *mocks):
+        self.notify(reference="REF-UNKNOWN")
+        with self.assertLogs("api.webhooks", "WARNING"):
+            result = process_webhook_events()
+        self.assertEqual((result["processed"], result["failed"]), (0, 1))
+        self.assertEqual(WebhookEvent.objects.get().result, "payment not found")
+
+    def test_expired_booking_is_failed_and_replayable(self, invoice_delay, email_delay):
+        Booking.objects.filter(pk=self.booking.pk).update(status="expired")
+        self.notify()
+        with self.assertLogs("api.webhooks", "WARNING"):
+            process_webhook_events()
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.result), ("failed", "payment received for an expired booking"))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, "pending")
+
+        # support re-opens the booking, then replays the event
+        Booking.objects.filter(pk=self.booking.pk).update(status="pending")
+        self.assertEqual(replay(WebhookEvent.objects.all()), 1)
+        process_webhook_events()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ("processed", 2))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, "confirmed")
+
+    def test_one_bad_event_does_not_hold_up_the_rest(self, *mocks):
+        self.notify(reference="REF-UNKNOWN")
+        self.notify()
+        with mock.patch("api.webhooks.logger"):
+            result = process_webhook_events(batch_size=1)
+        self.assertEqual((result["processed"], result["failed"], result["batches"]), (1, 1, 2))
+        self.assertEqual(result["inbox"], {"pending": 0, "failed": 1, "lag_seconds": 0.0})
+
+    def test_inbox_stats_are_staff_only(self, *mocks):
+        self.notify()
+        self.assertEqual(self.client.get("/api/webhooks/inbox/stats/").status_code, 403)
+        self.client.force_authenticate(make_user("ops", role="staff", is_staff=True))
+        response = self.client.get("/api/webhooks/inbox/stats/")
+        self.assertEqual((response.data["pending"], response.data["failed"]), (1, 0))
@@ -2,11 +2,11 @@ from rest_framework.routers import DefaultRouter
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
-    UserViewSet, VehicleCategoryViewSet, VehicleViewSet, VehicleAvailabilityViewSet,
+    UserViewSet, VehicleCategoryViewSet, VehicleViewSet, VehicleReservationViewSet,
     SafariPackageViewSet, SafariItineraryViewSet,
     BookingViewSet, PaymentViewSet, InvoiceViewSet,
     ReviewViewSet, NotificationViewSet, AdminLogViewSet,
-    pesapal_webhook, get_presigned_url
+    pesapal_webhook, webhook_inbox_stats, get_presigned_url, batch_presigned_urls, batch_quotes
 )
 
 # DRF router for ViewSets
@@ -14,7 +14,7 @@ router = DefaultRouter()
 router.register(r'users', UserViewSet)
 router.register(r'vehicle-categories', VehicleCategoryViewSet)
 router.register(r'vehicles', VehicleViewSet)
-router.register(r'vehicle-availabilities', VehicleAvailabilityViewSet)
+router.register(r'vehicle-reservations', VehicleReservationViewSet)
 router.register(r'safari-packages', SafariPackageViewSet)
 router.register(r'safari-itineraries', SafariItineraryViewSet)
 router.register(r'bookings', BookingViewSet)
@@ -27,8 +27,11 @@ router.register(r'admin-logs', AdminLogViewSet)
 # URL patterns
 urlpatterns = [
     path("", include(router.urls)),
+    path("quotes/batch/", batch_quotes, name="batch-quotes"),
     path("payments/pesapal/webhook/", pesapal_webhook, name="pesapal-webhook"),
+    path("webhooks/inbox/stats/", webhook_inbox_stats, name="webhook-inbox-stats"),
     path("uploads/presigned-url/", get_presigned_url, name="get-presigned-url"),
+    path("uploads/presigned-url/batch/", batch_presigned_urls, name="batch-presigned-urls"),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
@@ -3,35 +3,51 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import transaction
-from django.utils import timezone
 from django.conf import settings
 from django.core.cache import cache
+from django.http import HttpResponse
 
-import uuid, hashlib, hmac, base64
+import uuid, hashlib, hmac, base64, logging
 from urllib.parse import urlencode
-import boto3
-from datetime import timedelta
 
-from .tasks import send_booking_email, generate_invoice_and_email
+from utils.s3 import presigned_upload
+
+from .tasks import send_booking_email, send_group_booking_email
+from .webhooks import PESAPAL, inbox_stats, pesapal_dedupe_key, record_event
+from .availability import availability_matrix, window_from_params
+from .cache import get_version
+from .catalog import featured_safaris_json, popular_vehicles_json
+from .conditional import ConditionalGetMixin
+from .facets import cached_facets, safari_facets, vehicle_facets
+from .row_rendering import ValuesListMixin
+from .search import FullTextSearchFilter
+from .expansion import ExpandableQuerysetMixin
+from .idempotency import IdempotentCreateMixin, idempotent
+from .notifications import adjust_unread_count, mark_read, unread_count
+from .pricing import CURRENCY, QuoteError, get_rate_table, quote_item
 from .models import (
-    User, VehicleCategory, Vehicle, VehicleAvailability,
+    User, VehicleCategory, Vehicle, VehicleReservation,
     SafariPackage, SafariItinerary,
     Booking, Payment, Invoice,
     Review, Notification, AdminLog
 )
 from .serializers import (
-    UserSerializer, VehicleCategorySerializer, VehicleSerializer, VehicleAvailabilitySerializer,
-    SafariPackageSerializer, SafariItinerarySerializer,
-    BookingSerializer, BookingCreateSerializer,
+    UserSerializer, VehicleCategorySerializer, VehicleSerializer, VehicleReservationSerializer,
+    SafariPackageSerializer, SafariDepartureSerializer, SafariItinerarySerializer,
+    BookingSerializer, BookingCreateSerializer, BookingBatchCreateSerializer, QuoteBatchSerializer,
     PaymentSerializer, InvoiceSerializer,
-    ReviewSerializer, NotificationSerializer, AdminLogSerializer
+    ReviewSerializer, NotificationSerializer, NotificationMarkReadSerializer, AdminLogSerializer,
+    PresignedUploadBatchSerializer
 )
 from .filters import VehicleFilter, SafariFilter
-from .permissions import IsAdminOrReadOnly, IsAuthenticatedOrReadOnly, IsOwnerOrAdmin, IsCustomerOrAdmin
+from .permissions import IsAdminOrReadOnly, IsOwnerOrAdmin, IsCustomerOrAdmin
 
 
+logger = logging.getLogger(__name__)
+
 CACHE_TIMEOUT = 60 * 10  # 10 minutes
+MATRIX_DEFAULT_DAYS = 60
+MATRIX_MAX_DAYS = 180
 
 
 # -------------------------------
@@ -47,71 +63,94 @@ class UserViewSet(viewsets.ModelViewSet):
 # 2. Vehicles & Availability
 # -------------------------------
 class VehicleCategoryViewSet(viewsets.ModelViewSet):
-    queryset = VehicleCategory.objects.all()
+    queryset = VehicleCategory.objects.all().order_by("name")
     serializer_class = VehicleCategorySerializer
     permission_classes = [IsAdminOrReadOnly]
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
-    queryset = Vehicle.objects.all().select_related(
-        "category"
-    ).prefetch_related("availabilities", "images")
+class VehicleViewSet(ConditionalGetMixin, ValuesListMixin, ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Vehicle.objects.all().order_by("name")
+    # search reads category names, availability filters read reservations
+    conditional_models = (Vehicle, VehicleCategory, VehicleReservation)
     serializer_class = VehicleSerializer
     filterset_class = VehicleFilter
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    ordering_fields = ["daily_rate", "seats", "created_at"]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    ordering_fields = ["daily_rate", "seats", "average_rating", "review_count", "created_at"]
     search_fields = ["name", "description", "category__name"]
     permission_classes = [IsAdminOrReadOnly]
 
     @action(detail=False, methods=["get"], url_path="popular", permission_classes=[AllowAny])
     def popular(self, request):
-        cache_key = "popular_vehicles"
-        vehicles = cache.get(cache_key)
-        if vehicles is None:
-            vehicles = list(
-                Vehicle.objects.filter(is_popular=True)
-                .select_related("category")
-                .prefetch_related("images")[:10]
-            )
-            cache.set(cache_key, vehicles, CACHE_TIMEOUT)
-        serializer = self.get_serializer(vehicles, many=True)
-        return Response(serializer.data)
-
-
-class VehicleAvailabilityViewSet(viewsets.ModelViewSet):
-    queryset = VehicleAvailability.objects.all().select_related("vehicle")
-    serializer_class = VehicleAvailabilitySerializer
+        return HttpResponse(popular_vehicles_json(), content_type="application/json")
+
+    @action(detail=False, methods=["get"], url_path="facets", permission_classes=[AllowAny])
+    def facets(self, request):
+        content = cached_facets(self, vehicle_facets, self.conditional_models)
+        return HttpResponse(content, content_type="application/json")
+
+    @action(detail=False, methods=["get"], url_path="availability-matrix", permission_classes=[AllowAny])
+    def availability_matrix(self, request):
+        start, end = window_from_params(request.query_params, "from", "to", MATRIX_DEFAULT_DAYS - 1, MATRIX_MAX_DAYS)
+        category = request.query_params.get("category", "").strip().lower()
+
+        cache_key = f"availability_matrix:{get_version('availability')}:{start}:{end}:{category}"
+        data = cache.get(cache_key)
+        if data is None:
+            vehicles = Vehicle.objects.filter(is_available=True)
+            if category:
+                vehicles = vehicles.filter(category__name__iexact=category)
+            data = {
+                "from": start,
+                "to": end,
+                "days": (end - start).days + 1,
+                "vehicles": availability_matrix(vehicles, start, end),
+            }
+            cache.set(cache_key, data, CACHE_TIMEOUT)
+        return Response(data)
+
+
+class VehicleReservationViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = VehicleReservation.objects.all().order_by("-created_at")
+    serializer_class = VehicleReservationSerializer
     permission_classes = [IsAdminOrReadOnly]
 
 
 # -------------------------------
 # 3. Safari Packages
 # -------------------------------
-class SafariPackageViewSet(viewsets.ModelViewSet):
-    queryset = SafariPackage.objects.all().prefetch_related("itinerary", "images")
+class SafariPackageViewSet(ConditionalGetMixin, ValuesListMixin, ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = SafariPackage.objects.all().order_by("name")
+    conditional_models = (SafariPackage,)
     serializer_class = SafariPackageSerializer
     filterset_class = SafariFilter
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    ordering_fields = ["base_price", "duration_days", "seats_available"]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    ordering_fields = ["base_price", "duration_days", "seats_available", "average_rating", "review_count"]
     search_fields = ["name", "description", "region"]
     permission_classes = [IsAdminOrReadOnly]
 
     @action(detail=False, methods=["get"], url_path="featured", permission_classes=[AllowAny])
     def featured(self, request):
-        cache_key = "featured_safaris"
-        safaris = cache.get(cache_key)
-        if safaris is None:
-            safaris = list(
-                SafariPackage.objects.filter(is_featured=True)
-                .prefetch_related("itinerary", "images")[:10]
-            )
-            cache.set(cache_key, safaris, CACHE_TIMEOUT)
-        serializer = self.get_serializer(safaris, many=True)
-        return Response(serializer.data)
+        return HttpResponse(featured_safaris_json(), content_type="application/json")
+
+    @action(detail=False, methods=["get"], url_path="facets", permission_classes=[AllowAny])
+    def facets(self, request):
+        content = cached_facets(self, safari_facets, self.conditional_models)
+        return HttpResponse(content, content_type="application/json")
+
+    @action(detail=True, methods=["get"], url_path="departures", permission_classes=[AllowAny])
+    def departures(self, request, pk=None):
+        safari = self.get_object()
+        start, end = window_from_params(request.query_params, "from", "to", settings.AVAILABILITY_WINDOW_DAYS)
+        departures = safari.departures.filter(departure_date__range=(start, end)).order_by("departure_date")
+        # dates without a departure row still have the full capacity
+        return Response({
+            "capacity": safari.seats_available,
+            "departures": SafariDepartureSerializer(departures, many=True).data,
+        })
 
 
 class SafariItineraryViewSet(viewsets.ModelViewSet):
-    queryset = SafariItinerary.objects.all().select_related("safari_package")
+    queryset = SafariItinerary.objects.all().order_by("safari", "day_number")
     serializer_class = SafariItinerarySerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -119,31 +158,57 @@ class SafariItineraryViewSet(viewsets.ModelViewSet):
 # -------------------------------
 # 4. Bookings
 # -------------------------------
-class BookingViewSet(viewsets.ModelViewSet):
-    queryset = Booking.objects.all().select_related(
-        "user", "safari_package", "vehicle"
-    ).order_by("-created_at")
+class BookingViewSet(IdempotentCreateMixin, ConditionalGetMixin, ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Booking.objects.all().order_by("-created_at")
     permission_classes = [IsCustomerOrAdmin]
 
     def get_serializer_class(self):
         if self.action == "create":
             return BookingCreateSerializer
+        if self.action == "batch":
+            return BookingBatchCreateSerializer
         return BookingSerializer
 
     def perform_create(self, serializer):
         booking = serializer.save(user=self.request.user)
         send_booking_email.delay(str(booking.id))
 
+    @action(detail=False, methods=["post"], url_path="batch")
+    @idempotent
+    def batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save(user=request.user)
+        send_group_booking_email.delay([str(booking.id) for booking in bookings])
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def batch_quotes(request):
+    serializer = QuoteBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    table = get_rate_table()
+    quotes = []
+    for item in serializer.validated_data["items"]:
+        try:
+            quotes.append({"total_price": str(quote_item(table, item))})
+        except QuoteError as exc:
+            quotes.append({"error": str(exc)})
+    return Response({"currency": CURRENCY, "quotes": quotes})
+
 
 # -------------------------------
 # 5. Payments & Invoices (Pesapal)
 # -------------------------------
-class PaymentViewSet(viewsets.ModelViewSet):
-    queryset = Payment.objects.all().select_related("booking").order_by("-created_at")
+class PaymentViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Payment.objects.all().order_by("-created_at")
     serializer_class = PaymentSerializer
     permission_classes = [IsCustomerOrAdmin]
 
     @action(detail=False, methods=["post"], url_path="start")
+    @idempotent
     def start(self, request):
         booking_id = request.data.get("booking_id")
         try:
@@ -193,8 +258,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_201_CREATED)
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
-    queryset = Invoice.objects.all().select_related("payment").order_by("-issued_at")
+class InvoiceViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Invoice.objects.all().order_by("-issued_at")
     serializer_class = InvoiceSerializer
     permission_classes = [IsCustomerOrAdmin]
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
@@ -205,8 +270,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
 # -------------------------------
 # 6. Reviews
 # -------------------------------
-class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all().select_related("user", "safari_package", "vehicle").order_by("-created_at")
+class ReviewViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.all().order_by("-created_at")
     serializer_class = ReviewSerializer
     permission_classes = [IsCustomerOrAdmin]
 
@@ -214,17 +279,36 @@ class ReviewViewSet(viewsets.ModelViewSet):
 # -------------------------------
 # 7. Notifications
 # -------------------------------
-class NotificationViewSet(viewsets.ModelViewSet):
-    queryset = Notification.objects.all().select_related("user").order_by("-created_at")
+class NotificationViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Notification.objects.all().order_by("-created_at")
     serializer_class = NotificationSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # everyone only ever sees their own inbox
+        return super().get_queryset().filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        return Response({"unread": unread_count(request.user.pk)})
+
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request):
+        serializer = NotificationMarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = mark_read(self.get_queryset(), serializer.validated_data.get("ids"))
+        adjust_unread_count(request.user.pk, -updated)
+        return Response({"updated": updated})
 
 
 # -------------------------------
 # 8. Admin Logs
 # -------------------------------
-class AdminLogViewSet(viewsets.ModelViewSet):
-    queryset = AdminLog.objects.all().select_related("user").order_by("-created_at")
+class AdminLogViewSet(ExpandableQuerysetMixin, viewsets.ModelViewSet):
+    queryset = AdminLog.objects.all().order_by("-created_at")
     serializer_class = AdminLogSerializer
     permission_classes = [permissions.IsAdminUser]
 
@@ -234,36 +318,22 @@ class AdminLogViewSet(viewsets.ModelViewSet):
 # -------------------------------
 @api_view(["POST"])
 @permission_classes([AllowAny])
-@transaction.atomic
 def pesapal_webhook(request):
+    """Store the notification in the webhook inbox and acknowledge it; process_webhook_events applies it."""
     data = request.data or request.query_params
-    tx_ref = data.get("reference")
-    status_str = data.get("status")
 
-    if not tx_ref:
+    if not data.get("reference"):
         return Response({"detail": "missing transaction reference"}, status=400)
 
-    try:
-        payment = Payment.objects.select_for_update().select_related("booking").get(transaction_ref=tx_ref)
-    except Payment.DoesNotExist:
-        return Response({"detail": "payment not found"}, status=404)
-
-    if payment.status == "success":
-        return Response({"detail": "already processed"}, status=200)
-
-    if status_str and status_str.upper() == "COMPLETED":
-        payment.status = "success"
-        payment.save()
-        booking = payment.booking
-        booking.status = "confirmed"
-        booking.save()
-        generate_invoice_and_email.delay(str(payment.id))
-        send_booking_email.delay(str(booking.id))
-        return Response({"detail": "Pesapal payment confirmed"}, status=200)
-    else:
-        payment.status = "failed"
-        payment.save()
-        return Response({"detail": "Pesapal payment failed"}, status=200)
+    created = record_event(PESAPAL, pesapal_dedupe_key(data), {key: data.get(key) for key in data})
+    return Response({"detail": "received" if created else "already received"}, status=200)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def webhook_inbox_stats(request):
+    """Backlog and lag of the webhook inbox, for dashboards and alerts."""
+    return Response(inbox_stats())
 
 
 # -------------------------------
@@ -278,25 +348,27 @@ def get_presigned_url(request):
     if not file_name or not file_type:
         return Response({"error": "file_name and file_type are required"}, status=400)
 
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
-
     key = f"uploads/{uuid.uuid4()}_{file_name}"
 
-    presigned_post = s3_client.generate_presigned_post(
-        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
-        Key=key,
-        Fields={"Content-Type": file_type},
-        Conditions=[{"Content-Type": file_type}],
-        ExpiresIn=3600
-    )
+    presigned_post = presigned_upload(key, file_type)
 
     return Response({
         "url": presigned_post["url"],
         "fields": presigned_post["fields"],
         "key": key
     })
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_presigned_urls(request):
+    """Presigned POSTs for a whole gallery in one request; signing is local, so this makes no S3 calls."""
+    serializer = PresignedUploadBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    uploads = []
+    for item in serializer.validated_data["files"]:
+        key = f"uploads/{uuid.uuid4()}_{item['file_name']}"
+        presigned_post = presigned_upload(key, item["file_type"])
+        uploads.append({"url": presigned_post["url"], "fields": presigned_post["fields"], "key": key})
+    return Response({"uploads": uploads})
@@ -0,0 +1,139 @@
+"""
+Payment webhook inbox.
+
+Pesapal retries a notification whenever we answer slowly, so the webhook
+does no work on the request thread: it inserts the raw event into the
+WebhookEvent inbox, where retries of the same notification collapse onto one
+row, and answers 200. The process_webhook_events task applies pending events
+in batches, each in its own savepoint so one bad event can't hold up the
+rest. Failed events keep their error and stay put until replayed.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Booking, Payment, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+PESAPAL = "pesapal"
+DRAIN_SCHEDULED_KEY = "webhooks:drain-scheduled"
+
+
+class EventNotApplied(Exception):
+    """The event is well formed but can't be applied as things stand; it is kept as failed for replay."""
+
+
+def pesapal_dedupe_key(data):
+    # the same reference can legitimately report a new status later
+    return f"{data.get('reference')}:{(data.get('status') or '').upper()}"[:200]
+
+
+def record_event(provider, dedupe_key, payload):
+    """Insert the event unless it is already in the inbox; True if it was new."""
+    created = WebhookEvent.objects.bulk_create(
+        [WebhookEvent(provider=provider, dedupe_key=dedupe_key, payload=payload)],
+        ignore_conflicts=True,
+    )
+    # with ignore_conflicts the pk is never read back, so ask whether ours landed
+    inserted = WebhookEvent.objects.filter(pk=created[0].pk).exists()
+    if inserted:
+        transaction.on_commit(schedule_processing)
+    return inserted
+
+
+def schedule_processing():
+    """Process the inbox in WEBHOOK_BATCH_DELAY seconds unless a run is already due."""
+    if cache.add(DRAIN_SCHEDULED_KEY, 1, settings.WEBHOOK_BATCH_DELAY):
+        from .tasks import process_webhook_events  # tasks import this module
+
+        process_webhook_events.apply_async(countdown=settings.WEBHOOK_BATCH_DELAY)
+
+
+def apply_pesapal_event(payload):
+    """
+    Move the payment and its booking on; returns what happened, or raises
+    EventNotApplied. Call inside a transaction.
+    """
+    from .tasks import generate_invoice_and_email, send_booking_email
+
+    try:
+        payment = Payment.objects.select_for_update().get(transaction_ref=payload.get("reference"))
+    except Payment.DoesNotExist:
+        logger.warning("Pesapal event for unknown payment %s", payload.get("reference"))
+        raise EventNotApplied("payment not found")
+
+    if payment.status == "success":
+        return "already processed"
+
+    if (payload.get("status") or "").upper() != "COMPLETED":
+        payment.status = "failed"
+        payment.save()
+        return "payment failed"
+
+    payment.status = "success"
+    payment.save()
+    # lock the booking so the hold sweeper cannot expire it underneath us
+    booking = Booking.objects.select_for_update().get(pk=payment.booking_id)
+    if booking.status == "expired":
+        # hold lapsed and the inventory went back on sale: needs manual follow-up.
+        # Raising rolls the payment back too, so a replay after the fix confirms it.
+        logger.warning("Pesapal payment %s completed for expired booking %s", payment.id, booking.id)
+        raise EventNotApplied("payment received for an expired booking")
+    booking.status = "confirmed"
+    booking.hold_expires_at = None
+    booking.save()
+    transaction.on_commit(lambda: generate_invoice_and_email.delay(str(payment.id)))
+    transaction.on_commit(lambda: send_booking_email.delay(str(booking.id)))
+    return "payment confirmed"
+
+
+HANDLERS = {PESAPAL: apply_pesapal_event}
+
+
+def process_events(events):
+    """
+    Apply ``events`` and record the outcome on each; returns ``(processed,
+    failed)``. Call inside a transaction holding the events' locks.
+    """
+    processed = failed = 0
+    for event in events:
+        event.attempts += 1
+        try:
+            with transaction.atomic():
+                event.result = HANDLERS[event.provider](event.payload)
+        except EventNotApplied as exc:
+            event.status, event.result = "failed", str(exc)
+            failed += 1
+        except Exception as exc:
+            event.status, event.result = "failed", f"{type(exc).__name__}: {exc}"
+            failed += 1
+        else:
+            event.status, event.processed_at = "processed", timezone.now()
+            processed += 1
+    WebhookEvent.objects.bulk_update(events, ["status", "attempts", "result", "processed_at"])
+    return processed, failed
+
+
+def replay(queryset):
+    """Put the failed events of ``queryset`` back in line; returns how many."""
+    replayed = queryset.filter(status="failed").update(status="pending")
+    if replayed:
+        transaction.on_commit(schedule_processing)
+    return replayed
+
+
+def inbox_stats():
+    """Pending and failed counts, and how long the oldest pending event has waited (lag)."""
+    stats = WebhookEvent.objects.filter(status__in=["pending", "failed"]).aggregate(
+        pending=Count("pk", filter=Q(status="pending")),
+        failed=Count("pk", filter=Q(status="failed")),
+        oldest_pending=Min("received_at", filter=Q(status="pending")),
+    )
+    oldest = stats.pop("oldest_pending")
+    stats["lag_seconds"] = round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0
+    return stats
@@ -2,6 +2,7 @@ import os
 from celery import Celery
 from celery.schedules import crontab
 from django.conf import settings
+from kombu import Exchange, Queue
 
 # Set default Django settings module for Celery
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "travel.settings")
@@ -15,20 +16,111 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
+# -------------------------------
+# Queues & routing
+# -------------------------------
+# Every queue has its own workers (k8s/deployment-celery.yaml,
+# docker-compose.prod.yml), so an invoice backfill can't hold up a booking
+# confirmation. Prefetch is a worker option: keep the workers' --prefetch-multiplier
+# in line with this table.
+QUEUE_PROFILES = {
+    # short SMTP calls; at-most-once, a redelivery would send the mail twice
+    "email": {"prefetch_multiplier": 4, "acks_late": False},
+    # CPU-heavy PDF builds; one at a time per process so nothing waits behind a
+    # busy child, and redelivered if a worker dies (the invoice is upserted)
+    "invoices": {"prefetch_multiplier": 1, "acks_late": True},
+    # payment notifications confirm bookings; a rerun only drains the inbox again
+    "webhooks": {"prefetch_multiplier": 1, "acks_late": True},
+    # idempotent rebuilds and sweeps, safe to rerun
+    "cache": {"prefetch_multiplier": 1, "acks_late": True},
+    "maintenance": {"prefetch_multiplier": 1, "acks_late": True},
+    # unrouted tasks; consumed by the maintenance workers
+    "default": {"prefetch_multiplier": 1, "acks_late": False},
+}
+
+# Redis pops lower numbers first: 0 is the most urgent, 9 the least
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+TASK_ROUTES = {
+    "api.tasks.send_booking_email": {"queue": "email", "priority": PRIORITY_HIGH},
+    "api.tasks.send_group_booking_email": {"queue": "email", "priority": PRIORITY_HIGH},
+    "api.tasks.send_queued_emails": {"queue": "email", "priority": PRIORITY_HIGH},
+    "api.tasks.generate_invoice_and_email": {"queue": "invoices"},
+    # backfills queue behind invoices for fresh payments
+    "api.tasks.regenerate_invoices": {"queue": "invoices", "priority": PRIORITY_LOW},
+    "api.tasks.process_webhook_events": {"queue": "webhooks"},
+    "api.tasks.warm_featured_cache": {"queue": "cache"},
+    "api.tasks.release_expired_holds": {"queue": "maintenance"},
+    "api.tasks.reconcile_ratings": {"queue": "maintenance"},
+}
+
+app.conf.update(
+    task_queues=[Queue(name, Exchange(name), routing_key=name) for name in QUEUE_PROFILES],
+    task_default_queue="default",
+    task_routes=TASK_ROUTES,
+    task_annotations={
+        name: {"acks_late": QUEUE_PROFILES[route["queue"]]["acks_late"]}
+        for name, route in TASK_ROUTES.items()
+    },
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+        # unacked (acks_late) messages come back after this; must outlast the longest task
+        "visibility_timeout": 60 * 60,
+    },
+)
+
+
 # Optional: periodic tasks
 @app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
     """
     Example of periodic tasks:
     - Pre-warm cache for featured safaris and popular vehicles every hour
+    - Release inventory of unpaid bookings whose hold expired
+    - Send queued emails left behind by a failed drain
+    - Process webhook events left in the inbox
+    - Reconcile denormalized review aggregates
     """
     # Run warm_featured_cache every hour
     sender.add_periodic_task(
         crontab(minute=0, hour='*'),
-        'api.tasks.warm_featured_cache',
+        sender.signature('api.tasks.warm_featured_cache'),
         name='Pre-warm cache hourly'
     )
 
+    # Release inventory held by unpaid bookings every 5 minutes
+    sender.add_periodic_task(
+        crontab(minute='*/5'),
+        sender.signature('api.tasks.release_expired_holds'),
+        name='Release expired booking holds'
+    )
+
+    # Retry queued emails whose drain failed or never ran
+    sender.add_periodic_task(
+        crontab(minute='*'),
+        sender.signature('api.tasks.send_queued_emails'),
+        name='Send queued emails'
+    )
+
+    # Pick up webhook events whose scheduled run was lost
+    sender.add_periodic_task(
+        crontab(minute='*'),
+        sender.signature('api.tasks.process_webhook_events'),
+        name='Process webhook inbox'
+    )
+
+    # Repair denormalized review aggregates nightly
+    sender.add_periodic_task(
+        crontab(minute=30, hour=3),
+        sender.signature('api.tasks.reconcile_ratings'),
+        name='Reconcile rating aggregates'
+    )
+
 
 # For debugging, define a simple test task
 @app.task(bind=True)
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party
     'rest_framework',
@@ -157,7 +158,10 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': config("API_PAGE_SIZE", default=50, cast=int),
 }
+API_MAX_PAGE_SIZE = config("API_MAX_PAGE_SIZE", default=200, cast=int)
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'God Father Travels API',
@@ -199,6 +203,14 @@ AWS_S3_FILE_OVERWRITE = os.getenv("AWS_S3_FILE_OVERWRITE") == "True"
 AWS_DEFAULT_ACL = os.getenv("AWS_DEFAULT_ACL")
 AWS_QUERYSTRING_AUTH = os.getenv("AWS_QUERYSTRING_AUTH") == "True"
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+# Point S3 traffic at an S3-compatible stand-in (MinIO, a local stub); also read by django-storages
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
+# Shared S3 client (utils/s3.py): HTTP connections per process (parallel invoice
+# uploads use up to this many), timeouts in seconds and attempts per call
+AWS_S3_MAX_POOL_CONNECTIONS = config("AWS_S3_MAX_POOL_CONNECTIONS", default=20, cast=int)
+AWS_S3_CONNECT_TIMEOUT = config("AWS_S3_CONNECT_TIMEOUT", default=5, cast=int)
+AWS_S3_READ_TIMEOUT = config("AWS_S3_READ_TIMEOUT", default=30, cast=int)
+AWS_S3_MAX_ATTEMPTS = config("AWS_S3_MAX_ATTEMPTS", default=4, cast=int)
 
 # -------------------------------
 # Celery
@@ -231,3 +243,28 @@ CACHES = {
 
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
+
+# How long a pending booking holds its days/seats while payment completes
+BOOKING_HOLD_TTL = timedelta(minutes=config("BOOKING_HOLD_TTL_MINUTES", default=30, cast=int))
+
+# Stored responses for Idempotency-Key retries
+IDEMPOTENCY_TTL = config("IDEMPOTENCY_TTL", default=60 * 60 * 24, cast=int)
+
+# Reservations rendered with a vehicle: today..+AVAILABILITY_WINDOW_DAYS unless
+# ?availability_from=&availability_to= ask for more, up to the max
+AVAILABILITY_WINDOW_DAYS = config("AVAILABILITY_WINDOW_DAYS", default=90, cast=int)
+AVAILABILITY_MAX_WINDOW_DAYS = config("AVAILABILITY_MAX_WINDOW_DAYS", default=366, cast=int)
+
+# Queued emails are sent EMAIL_BATCH_SIZE at a time over one connection, at most
+# EMAIL_BATCH_DELAY seconds after they were queued; a message is given up on
+# after EMAIL_MAX_ATTEMPTS failed sends. A message claimed by a drain that never
+# finished (e.g. a killed worker) is picked up again after EMAIL_CLAIM_TIMEOUT seconds
+EMAIL_BATCH_SIZE = config("EMAIL_BATCH_SIZE", default=50, cast=int)
+EMAIL_BATCH_DELAY = config("EMAIL_BATCH_DELAY", default=5, cast=int)
+EMAIL_MAX_ATTEMPTS = config("EMAIL_MAX_ATTEMPTS", default=5, cast=int)
+EMAIL_CLAIM_TIMEOUT = config("EMAIL_CLAIM_TIMEOUT", default=300, cast=int)
+
+# Webhook inbox: events are processed WEBHOOK_BATCH_SIZE at a time, at most
+# WEBHOOK_BATCH_DELAY seconds after they arrive
+WEBHOOK_BATCH_SIZE = config("WEBHOOK_BATCH_SIZE", default=100, cast=int)
+WEBHOOK_BATCH_DELAY = config("WEBHOOK_BATCH_DELAY", default=1, cast=int)
@@ -1,25 +1,89 @@
+import threading
+
 import boto3
+from botocore.config import Config
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from datetime import datetime, timedelta
 
-def generate_presigned_url(file_name: str, file_type: str, expires_in=3600):
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME,
-    )
+_client = None
+_client_lock = threading.Lock()
+
+
+def build_s3_client(**overrides):
+    """A new S3 client from settings; ``overrides`` replace individual client options."""
+    endpoint_url = overrides.get("endpoint_url", settings.AWS_S3_ENDPOINT_URL)
+    options = {
+        "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
+        "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
+        "region_name": settings.AWS_S3_REGION_NAME,
+        "endpoint_url": endpoint_url,
+        "config": Config(
+            signature_version="s3v4",
+            max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.AWS_S3_CONNECT_TIMEOUT,
+            read_timeout=settings.AWS_S3_READ_TIMEOUT,
+            # standard mode backs off on throttling and transient 5xx/connection errors
+            retries={"mode": "standard", "total_max_attempts": settings.AWS_S3_MAX_ATTEMPTS},
+            # custom endpoints (stubs, MinIO) rarely resolve bucket subdomains
+            s3={"addressing_style": "path" if endpoint_url else "auto"},
+        ),
+    }
+    options.update(overrides)
+    return boto3.client("s3", **options)
+
+
+def get_s3_client():
+    """
+    The process-wide S3 client, built on first use. Clients are thread-safe,
+    so every thread shares it and its connection pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_s3_client()
+    return _client
+
+
+def reset_s3_client():
+    """Drop the shared client so the next call rebuilds it from the current settings."""
+    global _client
+    with _client_lock:
+        _client = None
 
-    presigned_post = s3_client.generate_presigned_post(
+
+@receiver(setting_changed)
+def _rebuild_on_aws_settings_change(setting, **kwargs):
+    # lets override_settings(AWS_S3_ENDPOINT_URL=...) point the client at a stub
+    if setting.startswith("AWS_"):
+        reset_s3_client()
+
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
+
+
+def presigned_upload(key: str, file_type: str, expires_in=3600):
+    """
+    Presigned POST letting a browser upload ``key`` directly, restricted to
+    ``file_type`` and 1 byte to MAX_UPLOAD_SIZE. Signed locally, so it makes
+    no network call.
+    """
+    return get_s3_client().generate_presigned_post(
         Bucket=settings.AWS_STORAGE_BUCKET_NAME,
-        Key=file_name,
+        Key=key,
         Fields={"Content-Type": file_type},
         Conditions=[
             {"Content-Type": file_type},
-            ["content-length-range", 1, 5242880]  # 1 byte to 5MB
+            ["content-length-range", 1, MAX_UPLOAD_SIZE],
         ],
         ExpiresIn=expires_in,
     )
 
+
+def generate_presigned_url(file_name: str, file_type: str, expires_in=3600):
+    presigned_post = presigned_upload(file_name, file_type, expires_in)
+
     file_url = f"https://{settings.AWS_S3_CUSTOM_DOMAIN}/{file_name}"
     return presigned_post, file_url